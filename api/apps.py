@@ -6,4 +6,7 @@ class ApiConfig(AppConfig):
     name = "api"
     
     def ready(self):
-        from . import signals
\ No newline at end of file
+        from . import signals
+        from .reaction_buffer import check_cache_backend
+
+        check_cache_backend()
\ No newline at end of file
@@ -0,0 +1,188 @@
+"""
+API benchmark harness: drives the main endpoints through Django's test
+client as anonymous, regular and manager users and records latency
+percentiles, SQL query counts and SQL time per endpoint and role.
+
+`manage.py bench_api` wraps it (seeding, JSON output, baseline diffs). It
+can also be used directly, pytest-benchmark style:
+
+    results = run_benchmarks(iterations=50, only=["post_detail"])
+    assert not compare(results, baseline, tolerance=0.2)
+
+Throttle rates are raised for the duration of a run, so the throttles still
+do their cache round trips but never reject a request. Anonymous GETs go
+through the response cache like real traffic: after the first request
+they measure cache hits.
+"""
+import time
+from contextlib import contextmanager
+from urllib.parse import quote
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework.throttling import SimpleRateThrottle
+
+from api.auth import get_jwt
+from api.models import Post, PostUserLikes, Tag
+
+ROLES = ("anonymous", "regular", "manager")
+# Dataset presets (seed_demo --bulk arguments) for --scale.
+SCALES = {
+    "small": {"users": 50, "posts": 500, "comments": 2_000, "likes": 5_000},
+    "medium": {"users": 500, "posts": 10_000, "comments": 50_000, "likes": 100_000},
+    "large": {"users": 5_000, "posts": 100_000, "comments": 500_000, "likes": 1_000_000},
+}
+PERCENTILES = (50, 95, 99)
+SCENARIO_NAMES = (
+    "post_list", "post_list_search", "post_list_tag", "post_list_ordering", "post_detail",
+    "tag_suggest", "comment_list", "like_create", "like_delete", "login",
+)
+# Scenarios that need a logged-in user, skipped for anonymous callers.
+AUTH_ONLY = {"like_create", "like_delete"}
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return None
+    rank = max(1, -(-pct * len(sorted_values) // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(samples):
+    """[(seconds, queries, sql seconds, status)] -> one result dict (times in ms)."""
+    latencies = sorted(s[0] * 1000 for s in samples)
+    result = {f"p{p}_ms": round(percentile(latencies, p), 3) for p in PERCENTILES}
+    result.update({
+        "mean_ms": round(sum(latencies) / len(latencies), 3),
+        "queries": max(s[1] for s in samples),
+        "sql_ms": round(sum(s[2] for s in samples) * 1000 / len(samples), 3),
+        "statuses": sorted({s[3] for s in samples}),
+        "n": len(samples),
+    })
+    return result
+
+
+def measure(client, method, path, data=None):
+    """One request -> (seconds, query count, SQL seconds, status code)."""
+    call = getattr(client, method.lower())
+    kwargs = {"content_type": "application/json"} if data is not None else {}
+    with CaptureQueriesContext(connection) as queries:
+        start = time.perf_counter()
+        response = call(path, data, **kwargs) if data is not None else call(path)
+        elapsed = time.perf_counter() - start
+    sql = sum(float(q.get("time") or 0) for q in queries.captured_queries)
+    return elapsed, len(queries.captured_queries), sql, response.status_code
+
+
+@contextmanager
+def unthrottled():
+    rates = {scope: "1000000/min" for scope in SimpleRateThrottle.THROTTLE_RATES}
+    with mock.patch.dict(SimpleRateThrottle.THROTTLE_RATES, rates):
+        yield
+
+
+def _client(user):
+    if user is None:
+        return Client()
+    return Client(HTTP_AUTHORIZATION=f"Bearer {get_jwt(user)['access']}")
+
+
+def _fixtures():
+    """Ids the scenarios need, picked from whatever data is in the database."""
+    post = (
+        Post.objects.order_by("-comments_count", "-likes_count", "pk")
+        .values("pk", "title").first()
+    )
+    if post is None:
+        raise ValueError("No posts to benchmark against; seed some data first.")
+    tag = Tag.objects.order_by("-usage_count").values_list("name", flat=True).first() or "django"
+    word = (post["title"].split() or ["post"])[0]
+    return {"post_id": post["pk"], "tag": tag, "word": word, "prefix": tag[:2]}
+
+
+def scenarios(fixtures):
+    """name -> list of (method, path, body) requests; timed one by one."""
+    pid, tag = fixtures["post_id"], quote(fixtures["tag"])
+    return {
+        "post_list": [("GET", "/api/posts/", None)],
+        "post_list_search": [("GET", f"/api/posts/?q={quote(fixtures['word'])}", None)],
+        "post_list_tag": [("GET", f"/api/posts/?tag={tag}", None)],
+        "post_list_ordering": [("GET", "/api/posts/?ordering=-likes_count", None)],
+        "post_detail": [("GET", f"/api/posts/{pid}/", None)],
+        "tag_suggest": [("GET", f"/api/posts/tag_suggest/?q={quote(fixtures['prefix'])}", None)],
+        "comment_list": [("GET", f"/api/comments/?post={pid}", None)],
+        "like_create": [("POST", "/api/post-user-likes/", {"post": pid})],
+        "like_delete": [("DELETE", f"/api/post-user-likes/{pid}/by-post/", None)],
+    }
+
+
+def run_benchmarks(iterations=30, warmup=3, only=None, roles=ROLES,
+                   regular_user="demo", manager_user="admin", password=None):
+    """
+    Returns {scenario: {role: summary}}. `login` is included (anonymous
+    role) when `password` is given for `regular_user`.
+    """
+    User = get_user_model()
+    users = {"anonymous": None}
+    for role, username in (("regular", regular_user), ("manager", manager_user)):
+        users[role] = User.objects.filter(username=username).first()
+        if users[role] is None and role in roles:
+            raise ValueError(f"No {role} user named {username!r}; seed data or pick another user.")
+    fixtures = _fixtures()
+    plan = scenarios(fixtures)
+    if password:
+        plan["login"] = [("POST", "/api/auth/login/", {"username": regular_user, "password": password})]
+    if only:
+        plan = {name: reqs for name, reqs in plan.items() if name in only}
+
+    results = {}
+    with unthrottled():
+        for role in roles:
+            client = _client(users[role])
+            profile = getattr(users[role], "profile", None)
+            for name, requests in plan.items():
+                if role == "anonymous" and name in AUTH_ONLY:
+                    continue
+                if name == "login" and role != "anonymous":
+                    continue
+                samples = []
+                for i in range(warmup + iterations):
+                    # Likes alternate create/delete so each call does real work.
+                    if name == "like_create":
+                        PostUserLikes.objects.filter(post_id=fixtures["post_id"], user=profile).delete()
+                    elif name == "like_delete":
+                        PostUserLikes.objects.get_or_create(post_id=fixtures["post_id"], user=profile)
+                    for method, path, body in requests:
+                        sample = measure(client, method, path, body)
+                        if i >= warmup:
+                            samples.append(sample)
+                results.setdefault(name, {})[role] = summarize(samples)
+            if profile is not None:
+                PostUserLikes.objects.filter(post_id=fixtures["post_id"], user=profile).delete()
+    return results
+
+
+def compare(results, baseline, tolerance=0.2, metric="p95_ms"):
+    """
+    Regressions of `results` against `baseline` (same shape): entries whose
+    `metric` grew by more than `tolerance` (a fraction), or that run more
+    queries than before. Returns a list of human-readable lines.
+    """
+    regressions = []
+    for name, by_role in results.items():
+        for role, now in by_role.items():
+            before = baseline.get(name, {}).get(role)
+            if not before:
+                continue
+            if before.get(metric) and now[metric] > before[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{name} [{role}]: {metric} {before[metric]} -> {now[metric]} "
+                    f"(+{(now[metric] / before[metric] - 1) * 100:.0f}%)"
+                )
+            if now["queries"] > before.get("queries", now["queries"]):
+                regressions.append(f"{name} [{role}]: queries {before['queries']} -> {now['queries']}")
+    return regressions
@@ -0,0 +1,115 @@
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+
+VERSION_KEY = "respcache:v:{}"
+CHANGED_AT_KEY = "respcache:t:{}"
+RESPONSE_KEY = "respcache:r:{}"
+
+
+def _fresh_version():
+    # Time-based, so a version key that was evicted never restarts at a
+    # value whose cached responses might still be around.
+    return int(time.time() * 1000)
+
+
+def get_versions(resources):
+    keys = [VERSION_KEY.format(r) for r in resources]
+    found = cache.get_many(keys)
+    for key in keys:
+        if key not in found:
+            cache.add(key, _fresh_version(), timeout=None)
+            found[key] = cache.get(key)
+    return [found[k] for k in keys]
+
+
+def bump_response_cache(*resources):
+    """
+    Invalidate every cached response depending on `resources`, in O(1):
+    bumping the version changes the key readers look up. Deferred to commit
+    so a reader can't cache pre-commit data under the new version.
+    """
+    def bump():
+        now = time.time()
+        for resource in resources:
+            key = VERSION_KEY.format(resource)
+            try:
+                cache.incr(key)
+            except ValueError:
+                cache.set(key, _fresh_version(), timeout=None)
+        cache.set_many({CHANGED_AT_KEY.format(r): now for r in resources}, timeout=None)
+
+    transaction.on_commit(bump)
+
+
+def last_changed(resources):
+    """Unix time of the most recent committed write to any of `resources` (0 if unknown)."""
+    found = cache.get_many([CHANGED_AT_KEY.format(r) for r in resources])
+    return max(found.values(), default=0)
+
+
+class AnonymousResponseCacheMixin:
+    """
+    Caches rendered JSON responses of safe, viewer-independent (anonymous)
+    requests. The key is the path, the normalized query string and the
+    current versions of the resources the action depends on, so any write
+    to those resources makes earlier entries unreachable.
+
+    Views declare `response_cache_resources = {"<action>": ("posts", ...)}`
+    and route handlers through `cached_response()`.
+    """
+    response_cache_resources = {}
+
+    def _response_cache_key(self, request, resources):
+        params = sorted(
+            (k, v) for k in request.query_params for v in request.query_params.getlist(k)
+        )
+        raw = "|".join([
+            request.path,
+            urlencode(params),
+            request.accepted_renderer.media_type,
+            ",".join(map(str, get_versions(resources))),
+        ])
+        return RESPONSE_KEY.format(hashlib.md5(raw.encode()).hexdigest())
+
+    def _response_is_cacheable(self, request):
+        return (
+            request.method == "GET"
+            and not request.user.is_authenticated
+            and getattr(request.accepted_renderer, "format", None) == "json"
+        )
+
+    def cached_response(self, request, handler, *args, **kwargs):
+        resources = self.response_cache_resources.get(self.action)
+        if not resources or not self._response_is_cacheable(request):
+            return handler(request, *args, **kwargs)
+
+        key = self._response_cache_key(request, resources)
+        hit = cache.get(key)
+        if hit is not None:
+            content, content_type = hit
+            response = HttpResponse(content, content_type=content_type)
+            response["X-Cache"] = "HIT"
+            return response
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            timeout = getattr(settings, "RESPONSE_CACHE_TIMEOUT", 300)
+
+            def store(rendered):
+                cache.set(key, (rendered.content, rendered["Content-Type"]), timeout)
+
+            response.add_post_render_callback(store)
+            response["X-Cache"] = "MISS"
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(request, super().retrieve, *args, **kwargs)
@@ -0,0 +1,100 @@
+from django.db.models import Prefetch, prefetch_related_objects
+
+from api.models import Comment
+
+COMMENTS_PREVIEW_LIMIT = 3
+COMMENTS_PREVIEW_MAX = 10
+
+# Siblings are ordered oldest first (by id, which follows created_at).
+#
+# - `roots`: one page (limit + 1, to detect a next page) of the level being
+#   requested: top-level comments, or the replies of `parent`, after `after`.
+# - `ranked`: every reply of the post numbered within its parent, so the
+#   recursive step can apply the per-level sibling limit (window functions
+#   are not allowed inside the recursive term itself).
+# - `tree`: walks down from the roots until `depth`.
+TREE_SQL = """
+WITH RECURSIVE roots AS (
+    SELECT id, ROW_NUMBER() OVER (ORDER BY id) AS rn
+    FROM api_comment
+    WHERE post_id = %(post)s AND {parent_clause} AND id > %(after)s
+    ORDER BY id
+    LIMIT %(page)s
+),
+ranked AS (
+    SELECT id, reply_to_id, ROW_NUMBER() OVER (PARTITION BY reply_to_id ORDER BY id) AS rn
+    FROM api_comment
+    WHERE post_id = %(post)s AND reply_to_id IS NOT NULL
+),
+tree AS (
+    SELECT id, 1 AS depth, rn FROM roots
+    UNION ALL
+    SELECT r.id, t.depth + 1, r.rn
+    FROM tree t
+    JOIN ranked r ON r.reply_to_id = t.id
+    WHERE t.depth < %(depth)s AND t.rn <= %(limit)s AND r.rn <= %(limit)s
+)
+SELECT
+    c.id, c.post_id, c.author_id, c.text, c.reply_to_id, c.created_at, c.updated_at,
+    u.username AS author_username,
+    tree.depth AS tree_depth,
+    tree.rn AS tree_rn,
+    (SELECT COUNT(*) FROM api_comment ch WHERE ch.reply_to_id = c.id) AS replies_count
+FROM tree
+JOIN api_comment c ON c.id = tree.id
+JOIN api_userprofile p ON p.id = c.author_id
+JOIN auth_user u ON u.id = p.user_id
+ORDER BY tree.depth, c.id
+"""
+
+
+def load_comment_tree(post_id, parent=None, after=0, depth=3, limit=10):
+    """
+    Load part of a post's thread in one query.
+
+    Returns (roots, has_more). `roots` are Comment instances for the
+    requested level, each carrying `author_username`, `replies_count` and
+    `children` (up to `limit` per level, `depth` levels deep). `has_more`
+    tells whether that level continues after the last root.
+    """
+    sql = TREE_SQL.format(
+        parent_clause="reply_to_id IS NULL" if parent is None else "reply_to_id = %(parent)s"
+    )
+    rows = list(Comment.objects.raw(sql, {
+        "post": post_id, "parent": parent, "after": after,
+        "depth": depth, "limit": limit, "page": limit + 1,
+    }))
+
+    by_id, roots = {}, []
+    for comment in rows:
+        comment.children = []
+        by_id[comment.pk] = comment
+        if comment.tree_depth == 1:
+            roots.append(comment)
+        else:
+            by_id[comment.reply_to_id].children.append(comment)
+
+    has_more = len(roots) > limit
+    return roots[:limit], has_more
+
+
+def prefetch_comment_previews(posts, limit=COMMENTS_PREVIEW_LIMIT):
+    """
+    Attach the newest `limit` comments of every post as `preview_comments`.
+    The sliced Prefetch becomes one ROW_NUMBER() OVER (PARTITION BY post_id
+    ORDER BY created_at DESC) query, served by comment_post_created_idx.
+    """
+    if not posts:
+        return
+    prefetch_related_objects(
+        posts,
+        Prefetch(
+            "comments",
+            queryset=(
+                Comment.objects
+                .select_related("author__user")
+                .order_by("-created_at", "-id")[:limit]
+            ),
+            to_attr="preview_comments",
+        ),
+    )
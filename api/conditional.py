@@ -0,0 +1,110 @@
+import hashlib
+import math
+import time
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from api.cache import get_versions, last_changed
+from api.permissions import current_profile
+from api.reaction_buffer import viewer_marker
+
+
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified support for list and retrieve.
+
+    Views that declare `conditional_resources` get validators from the
+    response-cache versions of those resources (see api.cache): every
+    committed write bumps them, so a cache read is all a 304 costs. Other
+    views fall back to one cheap query: MAX(updated_at) and COUNT(*) over the
+    filtered queryset for lists (plus `conditional_list_aggregates`), or the
+    row's own `conditional_detail_fields` for detail. Either way the ETag also
+    covers the request shape and the viewer, and a matching If-None-Match /
+    If-Modified-Since gets a 304 before the main query or the serializer run.
+    """
+    conditional_resources = ()
+    conditional_list_aggregates = {}
+    conditional_detail_fields = ("updated_at",)
+
+    def _viewer_key(self, request):
+        profile = current_profile(request.user)
+        if profile is None:
+            return "anon"
+        return ":".join(map(str, [
+            profile.pk, getattr(profile, "role", ""), int(request.user.is_staff),
+            viewer_marker(profile.pk),
+        ]))
+
+    def _list_validator(self):
+        qs = self.filter_queryset(self.get_queryset()).prefetch_related(None)
+        agg = qs.order_by().aggregate(
+            _last=Max("updated_at"), _n=Count("pk"), **self.conditional_list_aggregates
+        )
+        return agg.pop("_last"), agg
+
+    def _detail_validator(self):
+        lookup = self.lookup_url_kwarg or self.lookup_field
+        row = (
+            self.get_queryset().prefetch_related(None).order_by()
+            .filter(**{self.lookup_field: self.kwargs[lookup]})
+            .values(*self.conditional_detail_fields)
+            .first()
+        )
+        if row is None:
+            return None, None
+        return row.get("updated_at"), row
+
+    def get_validators(self, request):
+        """Return (etag, last_modified unix time), or (None, None) to skip."""
+        if self.conditional_resources:
+            updated, state = None, {}
+        elif self.action == "list":
+            updated, state = self._list_validator()
+        else:
+            updated, state = self._detail_validator()
+            if state is None:
+                return None, None
+
+        params = sorted((k, v) for k in request.query_params for v in request.query_params.getlist(k))
+        raw = "|".join(map(str, [
+            request.path, params,
+            getattr(request.accepted_renderer, "media_type", ""),
+            self._viewer_key(request),
+            updated, sorted(state.items()),
+            get_versions(self.conditional_resources) if self.conditional_resources else "",
+        ]))
+        etag = f'"{hashlib.md5(raw.encode()).hexdigest()}"'
+
+        stamps = [last_changed(self.conditional_resources)] if self.conditional_resources else []
+        if updated is not None:
+            stamps.append(updated.timestamp())
+        last_modified = math.ceil(max(stamps)) if any(stamps) else None
+        return etag, last_modified
+
+    def conditional_response(self, request, handler, *args, **kwargs):
+        if request.method not in ("GET", "HEAD"):
+            return handler(request, *args, **kwargs)
+
+        etag, last_modified = self.get_validators(request)
+        if etag is None:
+            return handler(request, *args, **kwargs)
+
+        not_modified = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        response = not_modified or handler(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            response["ETag"] = etag
+            # HTTP dates have 1s resolution: only advertise a second that is
+            # already over, so a later write always moves Last-Modified past it.
+            if last_modified and time.time() >= last_modified:
+                response["Last-Modified"] = http_date(last_modified)
+            # Validators depend on the viewer.
+            response["Cache-Control"] = "private, no-cache"
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(request, super().retrieve, *args, **kwargs)
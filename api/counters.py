@@ -0,0 +1,53 @@
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from api.models import Comment, Post, PostUserLikes
+
+
+# like_type -> Post counter column
+REACTION_COUNTERS = {
+    "like": "likes_count",
+    "dislike": "dislikes_count",
+}
+
+
+def bump_post_counters(post_id, **deltas):
+    """
+    Atomically add `deltas` (e.g. likes_count=1) to a post's counters in a
+    single UPDATE. Counters never go below zero, even if they have drifted.
+    """
+    deltas = {field: d for field, d in deltas.items() if d}
+    if not post_id or not deltas:
+        return 0
+    return Post.objects.filter(pk=post_id).update(**{
+        field: Greatest(F(field) + d, Value(0)) for field, d in deltas.items()
+    })
+
+
+def reaction_delta(like_type, delta):
+    field = REACTION_COUNTERS.get(like_type)
+    return {field: delta} if field else {}
+
+
+# ---------- recount ----------
+def _count_subquery(qs):
+    return Coalesce(
+        Subquery(
+            qs.order_by()
+            .values("post_id")
+            .annotate(n=Count("pk"))
+            .values("n"),
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    )
+
+
+def actual_counter_expressions():
+    """Correlated subqueries computing every counter from the source rows."""
+    likes = PostUserLikes.objects.filter(post_id=OuterRef("pk"))
+    return {
+        "likes_count": _count_subquery(likes.filter(like_type="like")),
+        "dislikes_count": _count_subquery(likes.filter(like_type="dislike")),
+        "comments_count": _count_subquery(Comment.objects.filter(post_id=OuterRef("pk"))),
+    }
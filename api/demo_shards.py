@@ -0,0 +1,128 @@
+"""
+Row generation for `seed_demo --bulk` / `--workers`.
+
+Nothing here imports Django or touches the database, so shards can be
+generated in worker processes (fork or spawn alike). A shard covers a
+contiguous range of posts plus the comments and likes on them, and is
+seeded from the run seed plus its index: the same arguments produce the
+same rows however many workers there are. The parent turns the returned
+tuples into model rows and inserts them.
+"""
+import random
+
+try:
+    from faker import Faker
+except ImportError:
+    Faker = None
+
+TITLES = [
+    "Hello World", "Django & DRF Tips", "Working with JWT",
+    "PostgreSQL on macOS", "Filtering & Search in DRF",
+    "Permissions the right way", "Signals & Profiles", "Dev Notes",
+]
+
+LOREM = (
+    "Lorem ipsum dolor sit amet, consectetur adipiscing elit. "
+    "Fusce a arcu non quam interdum iaculis. Sed semper, dui at "
+    "dignissim viverra, purus leo congue magna, ut ultrices nunc "
+    "nisi id orci."
+)
+
+POSTS_PER_AUTHOR = 3
+# Without an explicit like total, cap the 0–N likers per post so N (the
+# author count) can be large without likes growing as posts × users.
+DEFAULT_MAX_LIKERS = 20
+
+# Set once per process by init_worker.
+_authors = ()
+_tag_ids = ()
+_fake = None
+
+
+def init_worker(authors, tag_ids, use_faker):
+    global _authors, _tag_ids, _fake
+    _authors = tuple(authors)
+    _tag_ids = tuple(tag_ids)
+    _fake = Faker() if use_faker and Faker is not None else None
+
+
+def share(total, n_posts, first, count):
+    """Integer part of `total` for posts [first, first + count), proportional to their number."""
+    return total * (first + count) // n_posts - total * first // n_posts
+
+
+def plan_shards(n_posts, shard_size, seed, title_start, per_author, total_comments, total_likes):
+    """Split the run into shard specs (plain dicts, cheap to pickle)."""
+    n_shards = max(1, -(-n_posts // shard_size))
+    specs = []
+    for index in range(n_shards):
+        first = index * shard_size
+        count = min(shard_size, n_posts - first)
+        specs.append({
+            "index": index,
+            "seed": seed + index,
+            "first": first,
+            "count": count,
+            "title_start": title_start,
+            "per_author": per_author,
+            "comments": None if total_comments is None else share(total_comments, n_posts, first, count),
+            "likes": None if total_likes is None else share(total_likes, n_posts, first, count),
+        })
+    return specs
+
+
+def generate_shard(spec):
+    """
+    Returns {"index", "posts": [(author_id, title, text, tag_ids)],
+    "comments": [(post offset, author_id, text)], "likes": [(post offset, user_id)]},
+    offsets being positions within the shard's posts.
+    """
+    rng = random.Random(spec["seed"])
+    fake = _fake
+    if fake is not None:
+        fake.seed_instance(spec["seed"])
+    authors, n_authors = _authors, len(_authors)
+    count = spec["count"]
+
+    posts = []
+    for offset in range(count):
+        number = spec["first"] + offset
+        if spec["per_author"]:
+            author_id = authors[number // POSTS_PER_AUTHOR]
+        else:
+            author_id = rng.choice(authors)
+        tags = tuple(rng.sample(_tag_ids, k=rng.randint(0, min(3, len(_tag_ids)))))
+        posts.append((
+            author_id,
+            f"{rng.choice(TITLES)} (#{spec['title_start'] + number})",
+            LOREM if fake is None else fake.paragraph(nb_sentences=5),
+            tags,
+        ))
+
+    comments = []
+    if n_authors > 1 and count:
+        if spec["comments"] is None:
+            targets = [offset for offset in range(count) for _ in range(rng.randint(0, 2))]
+        else:
+            targets = [rng.randrange(count) for _ in range(spec["comments"])]
+        for i, offset in enumerate(targets):
+            commenter = rng.choice(authors)
+            while commenter == posts[offset][0]:
+                commenter = rng.choice(authors)
+            text = f"Comment #{spec['index'] + 1}.{i + 1}" if fake is None else fake.sentence()
+            comments.append((offset, commenter, text))
+
+    # (post, liker) pairs are deduplicated as one int each: offset * n + author position.
+    keys = set()
+    if n_authors and count:
+        if spec["likes"] is None:
+            for offset in range(count):
+                k = rng.randint(0, min(n_authors, DEFAULT_MAX_LIKERS))
+                keys.update(offset * n_authors + pos for pos in rng.sample(range(n_authors), k))
+        else:
+            wanted = min(spec["likes"], count * n_authors)
+            while len(keys) < wanted:
+                keys.add(rng.randrange(count) * n_authors + rng.randrange(n_authors))
+    likes = [(key // n_authors, authors[key % n_authors]) for key in sorted(keys)]
+
+    return {"index": spec["index"], "posts": posts, "comments": comments, "likes": likes}
@@ -0,0 +1,145 @@
+"""
+Read-only fast path for list endpoints.
+
+Rows come straight from `.values()` and are shaped into exactly the JSON the
+regular serializers produce (same keys, order and formatting), without
+instantiating models or serializer fields per row. Related data (tags,
+reactions, likers) is fetched once per page as plain tuples.
+
+FastListParityTests (api/tests.py) checks parity with the serializers;
+`manage.py bench_list_serialization` reports the per-row cost of both paths.
+"""
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from api.metrics import timed
+from api.models import Post
+
+_datetime = serializers.DateTimeField()
+
+
+def format_datetime(value):
+    """Same output as the serializers' DateTimeField (timezone, ISO 8601, 'Z')."""
+    return _datetime.to_representation(value)
+
+
+def tags_by_post(post_ids):
+    """{post_id: [{"id", "name"}, ...]} in the serializer's (name) order, in one query."""
+    through = Post.tags.through
+    result = {}
+    rows = (
+        through.objects.filter(post_id__in=post_ids)
+        .order_by("tag__name", "tag_id")
+        .values_list("post_id", "tag_id", "tag__name")
+    )
+    for post_id, tag_id, name in rows:
+        result.setdefault(post_id, []).append({"id": tag_id, "name": name})
+    return result
+
+
+# ---------- row shapers (key order follows the serializers' Meta.fields) ----------
+# Columns a view may leave out of .values() for sparse fieldsets come out as None.
+POST_VALUES = (
+    "id", "author_id", "author__user__username", "title", "text",
+    "excerpt", "word_count", "reading_time",
+    "likes_count", "dislikes_count", "comments_count", "created_at", "updated_at",
+)
+
+
+def post_rows(rows, tags, reactions, likers):
+    """
+    `tags`: {post_id: [tag dicts]}; `reactions`: {post_id: like_type} for the
+    viewer; `likers`: {post_id: [liker dicts]} holding a key for every post
+    whose likers the viewer may see (others serialize as None).
+    """
+    return [
+        {
+            "id": r["id"],
+            "author_id": r["author_id"],
+            "author_username": r.get("author__user__username"),
+            "title": r["title"],
+            "text": r.get("text"),
+            "excerpt": r["excerpt"],
+            "word_count": r["word_count"],
+            "reading_time": r["reading_time"],
+            "tags": tags.get(r["id"], []),
+            "likes_count": r["likes_count"],
+            "dislikes_count": r["dislikes_count"],
+            "comments_count": r["comments_count"],
+            "liked_by_me": r["id"] in reactions,
+            "my_reaction": reactions.get(r["id"]),
+            "likers": likers.get(r["id"]),
+            "created_at": format_datetime(r["created_at"]),
+            "updated_at": format_datetime(r["updated_at"]),
+        }
+        for r in rows
+    ]
+
+
+COMMENT_VALUES = (
+    "id", "post_id", "author_id", "author__user__username", "text",
+    "reply_to_id", "created_at", "updated_at",
+)
+
+
+def comment_rows(rows):
+    return [
+        {
+            "id": r["id"],
+            "post": r["post_id"],
+            "author_id": r["author_id"],
+            "author_username": r.get("author__user__username"),
+            "text": r.get("text"),
+            "reply_to": r["reply_to_id"],
+            "created_at": format_datetime(r["created_at"]),
+            "updated_at": format_datetime(r["updated_at"]),
+        }
+        for r in rows
+    ]
+
+
+TAG_VALUES = ("id", "name")
+
+
+def tag_rows(rows):
+    return [{"id": r["id"], "name": r["name"]} for r in rows]
+
+
+class FastListMixin:
+    """
+    Serves `list` from `.values(*fast_list_fields)` rows shaped by
+    `fast_list_rows()`, keeping filtering, ordering and pagination as they
+    are. Views can opt out per request with `use_fast_list()`;
+    FAST_LIST_SERIALIZATION=False turns the path off everywhere.
+    """
+    fast_list_fields = ()
+
+    def use_fast_list(self):
+        return bool(self.fast_list_fields) and getattr(settings, "FAST_LIST_SERIALIZATION", True)
+
+    def fast_list_rows(self, rows):
+        raise NotImplementedError
+
+    def get_fast_list_fields(self):
+        return self.fast_list_fields
+
+    def fast_list_queryset(self):
+        return (
+            self.filter_queryset(self.get_queryset())
+            .prefetch_related(None)
+            .values(*self.get_fast_list_fields())
+        )
+
+    def list(self, request, *args, **kwargs):
+        if not self.use_fast_list():
+            return super().list(request, *args, **kwargs)
+
+        queryset = self.fast_list_queryset()
+        page = self.paginate_queryset(queryset)
+        rows = list(queryset if page is None else page)
+        with timed("serialize"):
+            data = self.fast_list_rows(rows)
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
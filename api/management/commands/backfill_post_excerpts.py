@@ -0,0 +1,49 @@
+# Fills Post.excerpt / word_count / reading_time for rows written before those
+# columns existed (or by bulk paths that skipped Post.save). Works in id-ordered
+# batches, loading only id + text, so it can run against a live database.
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.cache import bump_response_cache
+from api.models import Post, POST_TEXT_STATS_FIELDS, text_stats
+
+
+class Command(BaseCommand):
+    help = "Compute Post.excerpt / word_count / reading_time in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500,
+                            help="Posts per batch (default 500).")
+        parser.add_argument("--all", action="store_true",
+                            help="Recompute every post, not only those without an excerpt.")
+
+    def handle(self, *args, **opts):
+        batch_size = max(1, int(opts["batch_size"]))
+        qs = Post.objects.all() if opts["all"] else Post.objects.filter(word_count=0)
+
+        updated = 0
+        last_id = 0
+        while True:
+            batch = list(
+                qs.filter(pk__gt=last_id)
+                .order_by("pk")
+                .only("id", "text")[:batch_size]
+            )
+            if not batch:
+                break
+            last_id = batch[-1].pk
+
+            for post in batch:
+                for field, value in text_stats(post.text).items():
+                    setattr(post, field, value)
+            # bulk_update leaves updated_at alone: the post itself did not change.
+            with transaction.atomic():
+                Post.objects.bulk_update(batch, POST_TEXT_STATS_FIELDS)
+                bump_response_cache("posts")
+            updated += len(batch)
+            self.stdout.write(f"… {updated} posts")
+
+        self.stdout.write(self.style.SUCCESS(f"Backfilled {updated} posts."))
@@ -0,0 +1,103 @@
+# Benchmarks the main API endpoints through Django's test client (see api.bench)
+# and prints p50/p95/p99 latency, SQL query count and SQL time per endpoint and
+# role as JSON. Optionally seeds a dataset first and diffs against a baseline.
+
+from __future__ import annotations
+
+import json
+import os
+import platform
+import sys
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from api.bench import ROLES, SCALES, SCENARIO_NAMES, compare, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = "Benchmark the main API endpoints (latency percentiles, SQL count/time) as JSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", choices=sorted(SCALES),
+                            help="Wipe and reseed with seed_demo --bulk at this scale first (needs --yes).")
+        parser.add_argument("--seed", type=int, default=42, help="Seed for --scale (default 42).")
+        parser.add_argument("--yes", "-y", action="store_true",
+                            help="Confirm that --scale may delete all posts, tags and non-staff users.")
+        parser.add_argument("--iterations", type=int, default=30, help="Timed requests per endpoint (default 30).")
+        parser.add_argument("--warmup", type=int, default=3, help="Untimed requests first (default 3).")
+        parser.add_argument("--only", action="append",
+                            help="Limit to a scenario (repeatable), e.g. post_list, like_create, login.")
+        parser.add_argument("--role", choices=ROLES, action="append",
+                            help="Limit to a role (repeatable; default all).")
+        parser.add_argument("--regular-user", default="demo", help="Regular user (default demo).")
+        parser.add_argument("--manager-user", default="admin", help="Manager user (default admin).")
+        parser.add_argument("--password", default=os.getenv("DEMO_PASSWORD", ""),
+                            help="Regular user's password for the login scenario (default $DEMO_PASSWORD).")
+        parser.add_argument("--output", "-o", help="Write the JSON report here instead of stdout.")
+        parser.add_argument("--baseline", help="Earlier report to compare with.")
+        parser.add_argument("--tolerance", type=float, default=0.2,
+                            help="Allowed p95 growth against --baseline, as a fraction (default 0.2).")
+        parser.add_argument("--fail-on-regression", action="store_true",
+                            help="Exit with status 1 if --baseline shows regressions.")
+
+    def handle(self, *args, **opts):
+        unknown = set(opts["only"] or ()) - set(SCENARIO_NAMES)
+        if unknown:
+            raise CommandError(f"Unknown scenario(s): {', '.join(sorted(unknown))}. "
+                               f"Known: {', '.join(SCENARIO_NAMES)}.")
+
+        if opts["scale"]:
+            if not opts["yes"]:
+                raise CommandError(
+                    "--scale deletes every post, tag and non-staff user in the configured "
+                    f"database ({connection.settings_dict.get('NAME')}) before reseeding; "
+                    "pass --yes to confirm."
+                )
+            self.stderr.write(f"Seeding '{opts['scale']}' dataset…")
+            call_command("seed_demo", bulk=True, fresh=True, yes=True, seed=opts["seed"],
+                         stdout=self.stderr, **SCALES[opts["scale"]])
+
+        try:
+            results = run_benchmarks(
+                iterations=max(1, opts["iterations"]),
+                warmup=max(0, opts["warmup"]),
+                only=opts["only"],
+                roles=opts["role"] or ROLES,
+                regular_user=opts["regular_user"],
+                manager_user=opts["manager_user"],
+                password=opts["password"] or None,
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc))
+
+        report = {
+            "meta": {
+                "at": timezone.now().isoformat(),
+                "scale": opts["scale"],
+                "iterations": opts["iterations"],
+                "database": connection.vendor,
+                "python": platform.python_version(),
+            },
+            "results": results,
+        }
+        text = json.dumps(report, indent=2, sort_keys=True)
+        if opts["output"]:
+            with open(opts["output"], "w", encoding="utf-8") as fh:
+                fh.write(text + "\n")
+            self.stderr.write(self.style.SUCCESS(f"Report written to {opts['output']}."))
+        else:
+            self.stdout.write(text)
+
+        if opts["baseline"]:
+            with open(opts["baseline"], encoding="utf-8") as fh:
+                baseline = json.load(fh).get("results", {})
+            regressions = compare(results, baseline, tolerance=opts["tolerance"])
+            for line in regressions:
+                self.stderr.write(self.style.ERROR(line))
+            if not regressions:
+                self.stderr.write(self.style.SUCCESS("No regressions against the baseline."))
+            elif opts["fail_on_regression"]:
+                sys.exit(1)
@@ -0,0 +1,79 @@
+# Micro-benchmark of the values-based list fast path (api.fast_serializers)
+# against the regular serializers, over the same rows as a given viewer.
+# Output parity is covered by FastListParityTests in api/tests.py.
+
+from __future__ import annotations
+
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api.views import CommentViewSet, PostViewSet, TagViewSet
+
+ENDPOINTS = {
+    "posts": (PostViewSet, "/api/posts/"),
+    "comments": (CommentViewSet, "/api/comments/"),
+    "tags": (TagViewSet, "/api/tags/"),
+}
+
+
+class Command(BaseCommand):
+    help = "Time the fast list serialization against the regular serializers (per-row cost)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=100, help="Rows per run (default 100).")
+        parser.add_argument("--repeat", type=int, default=20, help="Timed runs per path (default 20).")
+        parser.add_argument("--user", default="", help="Username to serialize as (default anonymous).")
+        parser.add_argument("--only", choices=sorted(ENDPOINTS), action="append",
+                            help="Limit to an endpoint (repeatable).")
+
+    def handle(self, *args, **opts):
+        rows = max(1, int(opts["rows"]))
+        repeat = max(1, int(opts["repeat"]))
+        user = None
+        if opts["user"]:
+            try:
+                user = get_user_model().objects.get(username=opts["user"])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"No user named {opts['user']!r}.")
+
+        for name in opts["only"] or ENDPOINTS:
+            viewset, path = ENDPOINTS[name]
+            view = self._view(viewset, path, user)
+
+            def regular():
+                objs = list(view.filter_queryset(view.get_queryset())[:rows])
+                return view.get_serializer(objs, many=True).data
+
+            def fast():
+                return view.fast_list_rows(list(view.fast_list_queryset()[:rows]))
+
+            n = len(fast())
+            if not n:
+                self.stdout.write(f"{name}: no rows to time.")
+                continue
+            slow_t, fast_t = self._time(regular, repeat), self._time(fast, repeat)
+            self.stdout.write(self.style.SUCCESS(
+                f"{name}: {n} rows | serializer {slow_t / n * 1e6:.1f} µs/row, "
+                f"fast path {fast_t / n * 1e6:.1f} µs/row ({slow_t / fast_t:.1f}x)"
+            ))
+
+    @staticmethod
+    def _view(viewset, path, user):
+        request = APIRequestFactory().get(path, HTTP_HOST="localhost")
+        if user is not None:
+            force_authenticate(request, user=user)
+        view = viewset(action_map={"get": "list"}, args=(), kwargs={}, format_kwarg=None)
+        view.request = view.initialize_request(request)
+        return view
+
+    @staticmethod
+    def _time(fn, repeat):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            best = min(best, time.perf_counter() - start)
+        return best
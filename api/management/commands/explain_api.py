@@ -0,0 +1,321 @@
+# Query-plan advisor. Builds the querysets the list viewsets really run (filters,
+# search and ordering applied by their own backends, first page sliced) for a
+# matrix of query strings, together with the page COUNT and any conditional-GET
+# aggregate the request also runs, EXPLAINs them against the current database and
+# reports sequential scans, sorts and row misestimates, then proposes indexes.
+# Full analysis needs PostgreSQL (EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON));
+# on SQLite only scans and temp-b-tree sorts from EXPLAIN QUERY PLAN are shown.
+
+from __future__ import annotations
+
+import json
+import re
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api.bench import SCALES
+from api.conditional import ConditionalGetMixin
+from api.models import Comment, Post, Tag
+from api.views import CommentViewSet, PostUserLikesViewSet, PostViewSet
+
+# Estimated vs actual rows off by more than this factor is reported.
+MISESTIMATE_FACTOR = 10
+
+_COLUMN_OP = re.compile(
+    r"(?:(?P<fn>lower|upper)\()?\(*(?:\w+\.)?\"?(?P<col>[a-z_][a-z0-9_]*)\"?\)*(?:::[\w ]+?)?\)*"
+    r"\s*(?P<op>=|<>|<=|>=|<|>|~~\*?|!~~\*?|@@)"
+)
+_SORT_KEY = re.compile(r"^(?:\(?(?P<table>\w+)\.)?(?P<col>\w+)\)?(?P<desc>\s+DESC)?", re.IGNORECASE)
+
+
+def _filter_columns(condition):
+    """[(column or expression, is_equality)] referenced by a plan Filter / Index Cond."""
+    found = []
+    for m in _COLUMN_OP.finditer(condition or ""):
+        col = m.group("col")
+        if col in ("text", "varchar", "integer", "bigint", "timestamp"):
+            continue
+        expr = f"{m.group('fn').upper()}({col})" if m.group("fn") else col
+        found.append((expr, m.group("op") == "="))
+    return found
+
+
+class Command(BaseCommand):
+    help = "EXPLAIN the API's list querysets over a filter/order/search matrix and suggest indexes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scale", choices=sorted(SCALES),
+                            help="Wipe and reseed with seed_demo --bulk at this scale first (needs --yes).")
+        parser.add_argument("--seed", type=int, default=42, help="Seed for --scale (default 42).")
+        parser.add_argument("--yes", "-y", action="store_true",
+                            help="Confirm that --scale may delete all posts, tags and non-staff users.")
+        parser.add_argument("--user", default="admin",
+                            help="User for authenticated cases such as the likes list (default admin).")
+        parser.add_argument("--only", action="append", help="Only cases whose name contains this (repeatable).")
+        parser.add_argument("--min-rows", type=int, default=1000,
+                            help="Ignore scans/sorts over fewer actual rows (default 1000).")
+        parser.add_argument("--show-plans", action="store_true", help="Print every plan in full.")
+        parser.add_argument("--json", action="store_true", help="Print the findings as JSON.")
+
+    def handle(self, *args, **opts):
+        if opts["scale"]:
+            if not opts["yes"]:
+                raise CommandError(
+                    "--scale deletes every post, tag and non-staff user in the configured "
+                    f"database ({connection.settings_dict.get('NAME')}) before reseeding; "
+                    "pass --yes to confirm."
+                )
+            self.stderr.write(f"Seeding '{opts['scale']}' dataset…")
+            call_command("seed_demo", bulk=True, fresh=True, yes=True, seed=opts["seed"],
+                         stdout=self.stderr, **SCALES[opts["scale"]])
+
+        user = get_user_model().objects.filter(username=opts["user"]).first()
+        cases = self._cases(user)
+        if opts["only"]:
+            cases = [c for c in cases if any(part in c[0] for part in opts["only"])]
+        if not cases:
+            raise CommandError("No cases to run; seed some posts first (or loosen --only).")
+
+        postgres = connection.vendor == "postgresql"
+        if not postgres:
+            self.stderr.write(self.style.WARNING(
+                f"{connection.vendor}: no EXPLAIN ANALYZE, reporting scans and sorts only."
+            ))
+
+        findings, proposals = [], {}
+        for name, sql, params in self._compiled(cases):
+            if postgres:
+                plan = self._explain_postgres(sql, params)
+                finding = self._analyze(plan["Plan"], opts["min_rows"])
+                finding["execution_ms"] = plan.get("Execution Time")
+                raw = plan
+            else:
+                rows = self._explain_other(sql, params)
+                finding = self._analyze_text(rows)
+                raw = rows
+            finding["case"] = name
+            findings.append(finding)
+            for proposal in finding.pop("_proposals", []):
+                proposals.setdefault(proposal, []).append(name)
+            if opts["show_plans"] and not opts["json"]:
+                self.stdout.write(f"--- {name}\n{sql}\n{json.dumps(raw, indent=2, default=str)}")
+
+        proposals = self._drop_existing(proposals)
+        if opts["json"]:
+            self.stdout.write(json.dumps({
+                "findings": findings,
+                "proposals": [{"table": t, "columns": list(c), "cases": n} for (t, c), n in proposals.items()],
+            }, indent=2, default=str))
+            return
+        self._print(findings, proposals)
+
+    # ---------- cases ----------
+    def _cases(self, user):
+        """[(name, viewset, query params, user or None)] over real ids and names from the DB."""
+        post = Post.objects.order_by("-comments_count", "pk").values("pk", "author_id", "title").first()
+        if post is None:
+            return []
+        tag = Tag.objects.order_by("-usage_count").values("pk", "name").first() or {"pk": 0, "name": "django"}
+        word = (post["title"].split() or ["post"])[0]
+
+        filters = {
+            "plain": {},
+            "tag": {"tag": tag["name"]},
+            "tag_id": {"tag_id": tag["pk"]},
+            "author": {"author": post["author_id"]},
+            "search": {"q": word},
+            "search+tag": {"q": word, "tag": tag["name"]},
+        }
+        orderings = ["", "-created_at", "-likes_count", "-comments_count", "title"]
+        cases = []
+        for fname, params in filters.items():
+            for ordering in orderings:
+                query = dict(params, **({"ordering": ordering} if ordering else {}))
+                cases.append((f"posts[{fname}{',' + ordering if ordering else ''}]", PostViewSet, query, None))
+        for ordering in ("", "created_at", "-created_at"):
+            query = {"post": post["pk"], **({"ordering": ordering} if ordering else {})}
+            cases.append((f"comments[post{',' + ordering if ordering else ''}]", CommentViewSet, query, None))
+        if Comment.objects.exists():
+            cases.append(("comments[plain]", CommentViewSet, {}, None))
+        if user is not None:
+            cases.append(("likes[mine]", PostUserLikesViewSet, {}, user))
+            cases.append(("likes[mine,post]", PostUserLikesViewSet, {"post": post["pk"]}, user))
+        return cases
+
+    def _compiled(self, cases):
+        """
+        Yield (name, sql, params) of each case's first page as the viewset
+        would run it, plus the queries that come with it: the page COUNT and,
+        for conditional-GET views validated from the database rather than
+        cache versions, the validator aggregate.
+        """
+        page_size = settings.REST_FRAMEWORK.get("PAGE_SIZE", 10)
+        factory = APIRequestFactory()
+        for name, viewset, query, user in cases:
+            path = f"/api/?{urlencode(query)}"
+            request = factory.get(path, HTTP_HOST="localhost")
+            if user is not None:
+                force_authenticate(request, user=user)
+            view = viewset(action_map={"get": "list"}, args=(), kwargs={}, format_kwarg=None)
+            view.request = view.initialize_request(request)
+            if getattr(view, "use_fast_list", lambda: False)():
+                qs = view.fast_list_queryset()
+            else:
+                qs = view.filter_queryset(view.get_queryset())
+            page = qs[:page_size]
+            yield (name, *page.query.get_compiler(using=page.db).as_sql())
+            # Page-number pagination also counts the whole result.
+            counted = qs.order_by()
+            sql, params = counted.query.get_compiler(using=counted.db).as_sql()
+            yield f"{name} COUNT", f"SELECT COUNT(*) FROM ({sql}) AS counted", params
+            if isinstance(view, ConditionalGetMixin) and not view.conditional_resources:
+                # Captured as run, with parameters already inlined.
+                with transaction.atomic(), CaptureQueriesContext(connection) as queries:
+                    view._list_validator()
+                    transaction.set_rollback(True)
+                yield f"{name} CONDITIONAL", queries.captured_queries[-1]["sql"], None
+
+    # ---------- EXPLAIN ----------
+    @staticmethod
+    def _explain_postgres(sql, params):
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + sql, params)
+            plan = cursor.fetchone()[0]
+            transaction.set_rollback(True)
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return plan[0]
+
+    @staticmethod
+    def _explain_other(sql, params):
+        with connection.cursor() as cursor:
+            cursor.execute(("EXPLAIN QUERY PLAN " if connection.vendor == "sqlite" else "EXPLAIN ") + sql, params)
+            return [str(row[-1]) for row in cursor.fetchall()]
+
+    # ---------- analysis ----------
+    def _analyze(self, root, min_rows):
+        """Walk a PostgreSQL JSON plan for seq scans, sorts and misestimates."""
+        seq_scans, sorts, misestimates, proposals = [], [], [], []
+        conditions = {}  # table -> [(column, is_equality)] seen in filters / index conditions
+
+        def walk(node, under_limit=False):
+            actual = node.get("Actual Rows", 0) * max(node.get("Actual Loops", 1), 1)
+            estimated = node.get("Plan Rows", 0) * max(node.get("Actual Loops", 1), 1)
+            relation = node.get("Relation Name")
+            if relation:
+                cols = _filter_columns(node.get("Filter")) + _filter_columns(node.get("Index Cond"))
+                conditions.setdefault(relation, []).extend(cols)
+            if node["Node Type"] == "Seq Scan":
+                scanned = actual + node.get("Rows Removed by Filter", 0) * max(node.get("Actual Loops", 1), 1)
+                if scanned >= min_rows:
+                    seq_scans.append({"table": relation, "rows_scanned": scanned, "rows_kept": actual,
+                                      "filter": node.get("Filter")})
+                    cols = _filter_columns(node.get("Filter"))
+                    if cols:
+                        proposals.append((relation, tuple(self._ordered(cols))))
+            if node["Node Type"] in ("Sort", "Incremental Sort") and actual + node.get("Plan Rows", 0) >= min_rows:
+                sorts.append({"key": node.get("Sort Key"), "method": node.get("Sort Method"),
+                              "rows": actual, "space_kb": node.get("Sort Space Used")})
+            low, high = sorted((max(actual, 1), max(estimated, 1)))
+            # Below a Limit, execution stops early: fewer rows than planned is expected.
+            stopped_early = under_limit and actual <= estimated
+            if high / low >= MISESTIMATE_FACTOR and high >= min_rows and not stopped_early:
+                misestimates.append({"node": node["Node Type"], "relation": relation,
+                                     "estimated": estimated, "actual": actual})
+            for child in node.get("Plans", []):
+                walk(child, under_limit or node["Node Type"] == "Limit")
+
+        walk(root)
+
+        # A sort on one table's columns could be an index walk instead: lead with
+        # that table's equality conditions, then the sort keys.
+        for sort in sorts:
+            keys = [_SORT_KEY.match(k.strip()) for k in sort["key"] or []]
+            tables = {m.group("table") for m in keys if m}
+            if not keys or not all(keys) or len(tables) != 1 or None in tables:
+                continue
+            # Django does not alias base tables, so the key prefix is the table name.
+            table = tables.pop()
+            if table not in connection.introspection.table_names():
+                continue
+            equal = [c for c, is_eq in conditions.get(table, []) if is_eq]
+            ordered = [f"{m.group('col')}{' DESC' if m.group('desc') else ''}" for m in keys]
+            proposals.append((table, tuple(dict.fromkeys(equal + ordered))))
+
+        return {"seq_scans": seq_scans, "sorts": sorts, "misestimates": misestimates, "_proposals": proposals}
+
+    @staticmethod
+    def _ordered(cols):
+        """Equality columns first (they can lead a btree), then the rest."""
+        eq = [c for c, is_eq in cols if is_eq]
+        rest = [c for c, is_eq in cols if not is_eq]
+        return list(dict.fromkeys(eq + rest))
+
+    @staticmethod
+    def _analyze_text(rows):
+        seq_scans = [{"table": r.split()[1], "detail": r} for r in rows
+                     if r.startswith("SCAN ") and " USING " not in r]
+        sorts = [{"detail": r} for r in rows if "TEMP B-TREE" in r]
+        return {"seq_scans": seq_scans, "sorts": sorts, "misestimates": []}
+
+    @staticmethod
+    def _drop_existing(proposals):
+        """Leave out proposals an existing index already starts with."""
+        kept = {}
+        with connection.cursor() as cursor:
+            for (table, columns), cases in proposals.items():
+                if not columns:
+                    continue
+                try:
+                    constraints = connection.introspection.get_constraints(cursor, table)
+                except Exception:
+                    constraints = {}
+                plain = [c.split()[0].lower() for c in columns]
+                covered = any(
+                    info.get("index") and [c.lower() for c in (info.get("columns") or [])][:len(plain)] == plain
+                    for info in constraints.values()
+                )
+                if not covered:
+                    kept[(table, columns)] = cases
+        return kept
+
+    # ---------- output ----------
+    def _print(self, findings, proposals):
+        for f in findings:
+            problems = len(f["seq_scans"]) + len(f["sorts"]) + len(f["misestimates"])
+            took = f" {f['execution_ms']:.1f} ms" if f.get("execution_ms") is not None else ""
+            style = self.style.WARNING if problems else self.style.SUCCESS
+            self.stdout.write(style(f"{f['case']}:{took} {problems or 'no'} finding(s)"))
+            for s in f["seq_scans"]:
+                detail = s.get("detail") or (
+                    f"{s['rows_scanned']} rows scanned, {s['rows_kept']} kept; filter: {s['filter']}"
+                )
+                self.stdout.write(f"    seq scan on {s['table']}: {detail}")
+            for s in f["sorts"]:
+                detail = s.get("detail") or f"{', '.join(s['key'] or [])} ({s['method']}, {s['rows']} rows)"
+                self.stdout.write(f"    sort: {detail}")
+            for m in f["misestimates"]:
+                self.stdout.write(
+                    f"    misestimate: {m['node']} {m['relation'] or ''} estimated {m['estimated']}, actual {m['actual']}"
+                )
+
+        if not proposals:
+            self.stdout.write(self.style.SUCCESS("\nNo index proposals."))
+            return
+        self.stdout.write(self.style.WARNING("\nProposed indexes:"))
+        for (table, columns), cases in proposals.items():
+            plain = "_".join(re.sub(r"\W+", "_", c.replace(" DESC", "")).strip("_").lower() for c in columns)
+            name = f"{table}_{plain}_idx"[:63]
+            # Expressions such as UPPER(name) need their own parentheses.
+            parts = ", ".join(f"({c})" if "(" in c else c for c in columns)
+            self.stdout.write(
+                f"  CREATE INDEX CONCURRENTLY {name} ON {table} ({parts});\n"
+                f"      -- for: {', '.join(sorted(set(cases)))}"
+            )
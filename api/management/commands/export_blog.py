@@ -0,0 +1,61 @@
+# Dumps posts (with tag names and counters), comments or likes as NDJSON or CSV
+# for analytics. Same rows as GET /api/export/: read through a server-side
+# cursor and written chunk by chunk, so it runs in flat memory on any table size.
+
+from __future__ import annotations
+
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.export import DEFAULT_CHUNK_SIZE, EXPORT_FORMATS, EXPORTS, export_lines, parse_bound
+
+
+class Command(BaseCommand):
+    help = "Stream posts, comments or likes to a file (or stdout) as NDJSON or CSV."
+
+    def add_arguments(self, parser):
+        parser.add_argument("kind", nargs="?", default="posts", choices=list(EXPORTS),
+                            help="What to export (default posts).")
+        parser.add_argument("--format", dest="output", default="ndjson", choices=EXPORT_FORMATS,
+                            help="Output format (default ndjson).")
+        parser.add_argument("--output", "-o", dest="path", default="-",
+                            help="File to write; '-' for stdout (default).")
+        parser.add_argument("--updated-after",
+                            help="Only rows with updated_at >= this ISO date/datetime.")
+        parser.add_argument("--updated-before",
+                            help="Only rows with updated_at < this ISO date/datetime.")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                            help=f"Rows fetched per cursor round trip (default {DEFAULT_CHUNK_SIZE}).")
+
+    def handle(self, *args, **opts):
+        filters = {"chunk_size": max(1, int(opts["chunk_size"]))}
+        for name in ("updated_after", "updated_before"):
+            if opts[name]:
+                try:
+                    filters[name] = parse_bound(opts[name])
+                except ValueError as exc:
+                    raise CommandError(str(exc))
+
+        lines = export_lines(opts["kind"], opts["output"], **filters)
+        if opts["path"] == "-":
+            self._write(lines, sys.stdout)
+            sys.stdout.flush()
+            return
+
+        # newline="" so the csv module's \r\n line endings are kept as-is.
+        with open(opts["path"], "w", encoding="utf-8", newline="") as fh:
+            written = self._write(lines, fh)
+        if opts["output"] == "csv":
+            written -= 1  # header line
+        self.stderr.write(self.style.SUCCESS(
+            f"Exported {written} {opts['kind']} to {opts['path']}."
+        ))
+
+    @staticmethod
+    def _write(lines, fh):
+        count = 0
+        for line in lines:
+            fh.write(line)
+            count += 1
+        return count
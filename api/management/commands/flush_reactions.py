@@ -0,0 +1,48 @@
+# Applies reactions buffered in write-behind mode (REACTION_WRITE_BEHIND) to the
+# database. Runs as a long-lived worker by default; on start it first replays
+# whatever an earlier, crashed flusher left unapplied.
+
+from __future__ import annotations
+
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from api.reaction_buffer import flush_reaction_buffer
+
+
+class Command(BaseCommand):
+    help = "Flush buffered (write-behind) reactions into PostUserLikes and the post counters."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true",
+                            help="Flush what is buffered now and exit (e.g. from cron or on deploy).")
+        parser.add_argument("--interval", type=int,
+                            default=getattr(settings, "REACTION_FLUSH_INTERVAL_MS", 250),
+                            help="Milliseconds between flushes (default REACTION_FLUSH_INTERVAL_MS).")
+        parser.add_argument("--batch-size", type=int, default=500,
+                            help="Events applied per transaction (default 500).")
+
+    def handle(self, *args, **opts):
+        batch_size = max(1, int(opts["batch_size"]))
+        interval = max(10, int(opts["interval"])) / 1000
+
+        replayed = flush_reaction_buffer(batch_size)
+        self.stdout.write(self.style.SUCCESS(f"Applied {replayed} buffered reactions."))
+        if opts["once"]:
+            return
+
+        self.stdout.write(f"Flushing every {int(interval * 1000)} ms. Ctrl+C to stop.")
+        try:
+            while True:
+                time.sleep(interval)
+                applied = flush_reaction_buffer(batch_size)
+                if applied:
+                    self.stdout.write(f"Applied {applied} buffered reactions.")
+                close_old_connections()
+        except KeyboardInterrupt:
+            # Leave nothing behind that was acknowledged before the stop.
+            applied = flush_reaction_buffer(batch_size)
+            self.stdout.write(self.style.SUCCESS(f"Stopped (applied {applied} more)."))
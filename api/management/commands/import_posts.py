@@ -0,0 +1,69 @@
+# Bulk-imports posts from an NDJSON file (or stdin), one post per line:
+#   {"title": "...", "text": "...", "author": "<username>", "tags": ["python", "django"]}
+# Same rules as POST /api/posts/import/: chunks are validated and inserted with
+# bulk_create, each chunk in one transaction; bad rows are reported and skipped.
+
+from __future__ import annotations
+
+import json
+import sys
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from api.post_import import DEFAULT_CHUNK_SIZE, import_posts
+
+
+class Command(BaseCommand):
+    help = "Import posts from NDJSON with batched inserts and a per-row error report."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", nargs="?", default="-",
+                            help="NDJSON file to read; '-' for stdin (default).")
+        parser.add_argument("--author",
+                            help="Username credited for rows without an \"author\".")
+        parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE,
+                            help=f"Rows per validation/insert transaction (default {DEFAULT_CHUNK_SIZE}).")
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Validate only; write nothing.")
+        parser.add_argument("--errors",
+                            help="Write the per-row error report here as NDJSON (default: stderr).")
+
+    def handle(self, *args, **opts):
+        default_author = None
+        if opts["author"]:
+            user = User.objects.select_related("profile").filter(username=opts["author"]).first()
+            if user is None:
+                raise CommandError(f"Unknown user: {opts['author']}")
+            default_author = user.profile
+
+        def progress(report):
+            self.stderr.write(f"… {report['created']} created, {report['failed']} failed")
+
+        if opts["path"] == "-":
+            report = self._import(sys.stdin, default_author, opts, progress)
+        else:
+            with open(opts["path"], encoding="utf-8") as fh:
+                report = self._import(fh, default_author, opts, progress)
+
+        if report["errors"]:
+            if opts["errors"]:
+                with open(opts["errors"], "w", encoding="utf-8") as fh:
+                    for error in report["errors"]:
+                        fh.write(json.dumps(error, ensure_ascii=False) + "\n")
+            else:
+                for error in report["errors"]:
+                    self.stderr.write(self.style.ERROR(json.dumps(error, ensure_ascii=False)))
+
+        verb = "Validated" if opts["dry_run"] else "Imported"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {report['created']} posts; {report['failed']} rows failed."))
+
+    @staticmethod
+    def _import(lines, default_author, opts, progress):
+        return import_posts(
+            lines,
+            default_author=default_author,
+            chunk_size=max(1, int(opts["chunk_size"])),
+            dry_run=opts["dry_run"],
+            on_chunk=progress,
+        )
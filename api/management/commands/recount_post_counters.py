@@ -0,0 +1,69 @@
+# Repairs drift in the denormalized Post counters (likes/dislikes/comments), e.g. after
+# bulk inserts or raw SQL that bypassed the signals. Works in id-ordered batches so it
+# can run against a live database.
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q, F
+
+from api.cache import bump_response_cache
+from api.counters import actual_counter_expressions
+from api.models import Post, POST_COUNTER_FIELDS
+
+
+class Command(BaseCommand):
+    help = "Recompute Post.likes_count / dislikes_count / comments_count and fix any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000,
+                            help="Posts checked per batch (default 1000).")
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Only report drifted posts; do not write.")
+
+    def handle(self, *args, **opts):
+        batch_size = max(1, int(opts["batch_size"]))
+        dry_run = bool(opts["dry_run"])
+        actual = actual_counter_expressions()
+        drifted = Q()
+        for field in POST_COUNTER_FIELDS:
+            drifted |= ~Q(**{field: F(f"actual_{field}")})
+
+        checked = fixed = 0
+        last_id = 0
+        while True:
+            ids = list(
+                Post.objects.filter(pk__gt=last_id)
+                .order_by("pk")
+                .values_list("pk", flat=True)[:batch_size]
+            )
+            if not ids:
+                break
+            last_id = ids[-1]
+            checked += len(ids)
+
+            bad_ids = list(
+                Post.objects.filter(pk__in=ids)
+                .annotate(**{f"actual_{f}": expr for f, expr in actual.items()})
+                .filter(drifted)
+                .values_list("pk", flat=True)
+            )
+            if not bad_ids:
+                continue
+
+            fixed += len(bad_ids)
+            if dry_run:
+                self.stdout.write(f"Drifted posts: {bad_ids}")
+                continue
+
+            # Recompute inside the UPDATE itself so concurrent likes/comments
+            # committed after the check above are not overwritten.
+            with transaction.atomic():
+                Post.objects.filter(pk__in=bad_ids).update(**actual)
+                bump_response_cache("posts")
+
+        verb = "would fix" if dry_run else "fixed"
+        self.stdout.write(self.style.SUCCESS(
+            f"Checked {checked} posts, {verb} {fixed}."
+        ))
@@ -6,6 +6,10 @@ import os
 import sys
 import random
 import secrets
+import time
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 from pathlib import Path
 from typing import List, Optional
 
@@ -13,10 +17,16 @@ from django.conf import settings
 from django.core.management.base import BaseCommand
 from django.contrib.auth import get_user_model
 from django.contrib.auth.hashers import make_password
-from django.db import transaction
+from django.db import connections, transaction
+from django.db.models import F
 from django.utils import timezone
 
+from api import demo_shards
+from api.cache import bump_response_cache
+from api.demo_shards import LOREM, TITLES
 from api.models import UserProfile, Tag, Post, Comment, PostUserLikes
+from api.search import refresh_search_vectors
+from api.tag_index import bump_tag_index_version
 
 try:
     from faker import Faker
@@ -25,19 +35,6 @@ except ImportError:
 
 User = get_user_model()
 
-TITLES: List[str] = [
-    "Hello World", "Django & DRF Tips", "Working with JWT",
-    "PostgreSQL on macOS", "Filtering & Search in DRF",
-    "Permissions the right way", "Signals & Profiles", "Dev Notes",
-]
-
-LOREM: str = (
-    "Lorem ipsum dolor sit amet, consectetur adipiscing elit. "
-    "Fusce a arcu non quam interdum iaculis. Sed semper, dui at "
-    "dignissim viverra, purus leo congue magna, ut ultrices nunc "
-    "nisi id orci."
-)
-
 TAGS: List[str] = ["general", "django", "drf", "postgres", "tips", "how-to"]
 
 
@@ -84,9 +81,22 @@ class Command(BaseCommand):
                             help="Deterministic RNG seed for reproducible data (e.g., --seed 42).")
         parser.add_argument("--allow-prod", action="store_true",
                             help="Explicitly allow seeding when DEBUG=False (use with caution!).")
+        parser.add_argument("--bulk", action="store_true",
+                            help="Insert with bulk_create in batches (for large load-test datasets).")
+        parser.add_argument("--batch-size", type=int, default=5000,
+                            help="Rows per bulk INSERT, and posts per shard, with --bulk (default 5000).")
+        parser.add_argument("--workers", type=int, default=0,
+                            help="Generate bulk shards in N processes (implies --bulk).")
 
-    @transaction.atomic
     def handle(self, *args, **opts):
+        # Row-by-row seeding runs in one transaction. Bulk seeding commits
+        # per batch and per shard instead, so big runs never hold one open.
+        if opts["bulk"] or opts["workers"]:
+            return self._handle(**opts)
+        with transaction.atomic():
+            return self._handle(**opts)
+
+    def _handle(self, **opts):
         # ---------- env guard ----------
         demo_env = os.getenv("DEMO_DATA", "").strip().lower() in {"1", "true", "yes"}
         allow_prod = bool(opts.get("allow_prod"))
@@ -120,6 +130,9 @@ class Command(BaseCommand):
         fresh = bool(opts["fresh"])
         only_demo_fresh = bool(opts["only_demo_fresh"])
         assume_yes = bool(opts["yes"])
+        workers = max(0, int(opts["workers"] or 0))
+        bulk = bool(opts["bulk"]) or workers > 0
+        batch_size = max(1, int(opts["batch_size"]))
 
         # ---------- password handling ----------
         demo_password = os.getenv("DEMO_PASSWORD")
@@ -174,6 +187,49 @@ class Command(BaseCommand):
                 user.save(update_fields=["password"])
             users.append(user)
 
+        if bulk:
+            self._seed_bulk(fake, demo_password_hash, total_users, total_posts,
+                            total_comments, total_likes, batch_size, workers, rng_seed)
+        else:
+            self._seed_rows(fake, demo_password, users, total_users, total_posts,
+                            total_comments, total_likes)
+
+        # ---------- summary ----------
+        out = {
+            "users": User.objects.count(),
+            "profiles": UserProfile.objects.count(),
+            "tags": Tag.objects.count(),
+            "posts": Post.objects.count(),
+            "comments": Comment.objects.count(),
+            "likes": PostUserLikes.objects.count(),
+        }
+        self.stdout.write(self.style.SUCCESS(f"Seeded ✅  {out}"))
+
+        try:
+            if generated:
+                creds = [
+                    "# Demo credentials (generated)",
+                    f"PASSWORD={demo_password}",
+                    "USERS=admin,demo,alice,bob",
+                    "",
+                    "Note: additional extra users (if any) share the same password.",
+                ]
+                creds_note_path.write_text("\n".join(creds), encoding="utf-8")
+                self.stdout.write(self.style.WARNING(
+                    f"Demo credentials written to {creds_note_path} (not printed)."
+                ))
+            else:
+                self.stdout.write(self.style.WARNING(
+                    "Demo credentials set via DEMO_PASSWORD env (not printed)."
+                ))
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(
+                f"Could not persist demo credentials file: {e!r}"
+            ))
+
+    def _seed_rows(self, fake, demo_password: str, users: List[User], total_users: int,
+                   total_posts: Optional[int], total_comments: Optional[int],
+                   total_likes: Optional[int]) -> None:
         # ---------- extra users ----------
         current_total = User.objects.count()
         if current_total < total_users:
@@ -304,38 +360,168 @@ class Command(BaseCommand):
                     lp = random.choice(authors_profiles)
                     PostUserLikes.objects.get_or_create(post=post, user=lp)
 
-        # ---------- summary ----------
-        out = {
-            "users": User.objects.count(),
-            "profiles": UserProfile.objects.count(),
-            "tags": Tag.objects.count(),
-            "posts": Post.objects.count(),
-            "comments": Comment.objects.count(),
-            "likes": PostUserLikes.objects.count(),
-        }
-        self.stdout.write(self.style.SUCCESS(f"Seeded ✅  {out}"))
+    # ----------------- bulk mode -----------------
+    def _seed_bulk(self, fake, demo_password_hash: str, total_users: int,
+                   total_posts: Optional[int], total_comments: Optional[int],
+                   total_likes: Optional[int], batch_size: int, workers: int,
+                   rng_seed: Optional[int]) -> None:
+        """
+        Same shape of data as _seed_rows, written with bulk_create. Posts,
+        comments and likes come from api.demo_shards, inline or in a pool of
+        `workers` processes; each shard is inserted in its own transaction.
+        bulk_create sends no signals, so profiles, post counters, tag usage
+        counts and search vectors are filled in here.
+        """
+        # ---------- users + profiles ----------
+        taken = set(User.objects.values_list("username", flat=True))
+        extra_needed = max(0, total_users - len(taken))
+        self.stdout.write(f"Creating {extra_needed} extra users…")
+        new_users = []
+        for i in range(extra_needed):
+            base_uname = fake.user_name() if fake else f"user{i+1}"
+            uname, suffix = base_uname, 1
+            while uname in taken:
+                suffix += 1
+                uname = f"{base_uname}{suffix}"
+            taken.add(uname)
+            new_users.append(User(
+                username=uname,
+                email=(fake.email() if fake else f"{uname}@example.com"),
+                password=demo_password_hash,
+            ))
+        self._bulk_insert(User, new_users, batch_size)
 
-        try:
-            if generated:
-                creds = [
-                    "# Demo credentials (generated)",
-                    f"PASSWORD={demo_password}",
-                    "USERS=admin,demo,alice,bob",
-                    "",
-                    "Note: additional extra users (if any) share the same password.",
-                ]
-                creds_note_path.write_text("\n".join(creds), encoding="utf-8")
-                self.stdout.write(self.style.WARNING(
-                    f"Demo credentials written to {creds_note_path} (not printed)."
-                ))
-            else:
-                self.stdout.write(self.style.WARNING(
-                    "Demo credentials set via DEMO_PASSWORD env (not printed)."
-                ))
-        except Exception as e:
-            self.stdout.write(self.style.ERROR(
-                f"Could not persist demo credentials file: {e!r}"
+        missing = User.objects.filter(profile__isnull=True).values_list("pk", flat=True)
+        self._bulk_insert(UserProfile, [UserProfile(user_id=pk) for pk in missing], batch_size, label="profiles")
+
+        tag_ids = [Tag.objects.get_or_create(name=name)[0].pk for name in TAGS]
+        authors = list(
+            UserProfile.objects.filter(user__is_superuser=False).order_by("pk").values_list("pk", flat=True)
+        )
+        if not authors:
+            self.stdout.write(self.style.WARNING(
+                "No non-admin authors found; skipping posts/comments/likes."
             ))
+            return
+
+        # ---------- shards ----------
+        per_author = total_posts is None
+        n_posts = len(authors) * demo_shards.POSTS_PER_AUTHOR if per_author else int(total_posts)
+        if n_posts <= 0:
+            return
+        # Titles must be unique; numbering past the current max id cannot
+        # collide with titles of earlier runs.
+        title_start = (Post.objects.order_by("-pk").values_list("pk", flat=True).first() or 0) + 1
+        seed = int(rng_seed) if rng_seed is not None else random.randrange(2 ** 31)
+        specs = demo_shards.plan_shards(n_posts, batch_size, seed, title_start, per_author,
+                                        total_comments, total_likes)
+        pool_size = min(workers, len(specs))
+        self.stdout.write(
+            f"Seeding {n_posts} posts in {len(specs)} shards"
+            + (f" on {pool_size} workers…" if pool_size > 1 else "…")
+        )
+
+        stats = {table: [0, 0.0] for table in ("posts", "post tags", "comments", "likes")}
+        started = time.monotonic()
+        init_args = (authors, tag_ids, fake is not None)
+        if pool_size > 1:
+            # Children must not inherit open database sockets.
+            connections.close_all()
+            with ProcessPoolExecutor(max_workers=pool_size, initializer=demo_shards.init_worker,
+                                     initargs=init_args) as pool:
+                for shard in self._bounded_map(pool, demo_shards.generate_shard, specs, 2 * pool_size):
+                    self._write_shard(shard, len(specs), batch_size, stats)
+        else:
+            demo_shards.init_worker(*init_args)
+            for spec in specs:
+                self._write_shard(demo_shards.generate_shard(spec), len(specs), batch_size, stats)
+
+        elapsed = max(time.monotonic() - started, 1e-9)
+        for table, (rows, seconds) in stats.items():
+            self.stdout.write(
+                f"{table}: {rows} rows, {rows / max(seconds, 1e-9):,.0f} rows/s inserting, "
+                f"{rows / elapsed:,.0f} rows/s overall"
+            )
+        bump_tag_index_version()
+        bump_response_cache("posts", "tags", "comments", "likes")
+
+    @staticmethod
+    def _bounded_map(pool, fn, items, window: int):
+        """pool.map that keeps at most `window` results pending, yielding in order."""
+        pending = deque()
+        items = iter(items)
+        for item in islice(items, window):
+            pending.append(pool.submit(fn, item))
+        while pending:
+            result = pending.popleft().result()
+            for item in islice(items, 1):
+                pending.append(pool.submit(fn, item))
+            yield result
+
+    def _write_shard(self, shard, n_shards: int, batch_size: int, stats) -> None:
+        """Insert one generated shard in a single transaction and update `stats`."""
+        comments_per_post = Counter(offset for offset, _, _ in shard["comments"])
+        likes_per_post = Counter(offset for offset, _ in shard["likes"])
+        through = Post.tags.through
+
+        def timed(table, model, objs):
+            t0 = time.monotonic()
+            model.objects.bulk_create(objs, batch_size=batch_size)
+            stats[table][0] += len(objs)
+            stats[table][1] += time.monotonic() - t0
+
+        with transaction.atomic():
+            posts = []
+            for offset, (author_id, title, text, _) in enumerate(shard["posts"]):
+                post = Post(
+                    author_id=author_id, title=title, text=text,
+                    likes_count=likes_per_post[offset],
+                    comments_count=comments_per_post[offset],
+                )
+                post.refresh_text_stats()
+                posts.append(post)
+            timed("posts", Post, posts)
+            post_ids = [p.pk for p in posts]
+
+            links = [
+                through(post_id=post_id, tag_id=tag_id)
+                for post_id, (_, _, _, tags) in zip(post_ids, shard["posts"])
+                for tag_id in tags
+            ]
+            timed("post tags", through, links)
+            for tag_id, count in Counter(link.tag_id for link in links).items():
+                Tag.objects.filter(pk=tag_id).update(usage_count=F("usage_count") + count)
+            refresh_search_vectors(post_ids)
+
+            timed("comments", Comment, [
+                Comment(post_id=post_ids[offset], author_id=author_id, text=text)
+                for offset, author_id, text in shard["comments"]
+            ])
+            timed("likes", PostUserLikes, [
+                PostUserLikes(post_id=post_ids[offset], user_id=user_id)
+                for offset, user_id in shard["likes"]
+            ])
+
+        self.stdout.write(
+            f"  shard {shard['index'] + 1}/{n_shards}: "
+            + ", ".join(f"{table} {rows}" for table, (rows, _) in stats.items())
+        )
+
+    def _bulk_insert(self, model, rows, batch_size: int, label: Optional[str] = None) -> int:
+        """bulk_create `rows` in batches, each committed on its own; reports rows/second."""
+        label = label or model._meta.verbose_name_plural
+        rows = iter(rows)
+        done = 0
+        started = time.monotonic()
+        while True:
+            batch = list(islice(rows, batch_size))
+            if not batch:
+                break
+            model.objects.bulk_create(batch)
+            done += len(batch)
+        elapsed = max(time.monotonic() - started, 1e-9)
+        self.stdout.write(f"{label}: {done} rows in {elapsed:.1f}s ({done / elapsed:,.0f} rows/s)")
+        return done
 
     def _confirm(self, prompt: str) -> bool:
         try:
@@ -0,0 +1,211 @@
+"""
+Per-request instrumentation: DB query count and time, serializer time and
+total time for every request, sent back as a `Server-Timing` header, logged
+when over the SLOW_REQUEST_* thresholds (with the slowest SQL), and folded
+into per-view latency histograms served in Prometheus text format by
+GET /api/metrics/. Streaming responses (exports) are measured until their
+body has been sent, and get no header.
+
+Histograms live in process memory: each worker reports its own, and a
+Prometheus scrape through a load balancer sees one worker at a time.
+"""
+import logging
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework import serializers
+
+logger = logging.getLogger("api.metrics")
+
+# Upper bounds (seconds) of the latency histogram buckets; +Inf is implied.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SLOWEST_SQL_KEPT = 3
+
+_current = ContextVar("request_metrics", default=None)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.slowest = []  # [(seconds, sql)], longest first
+        self.timers = {}
+        self._depth = {}
+
+    def record_query(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.queries += 1
+            self.db_time += elapsed
+            if len(self.slowest) < SLOWEST_SQL_KEPT or elapsed > self.slowest[-1][0]:
+                self.slowest.append((elapsed, sql))
+                self.slowest.sort(key=lambda item: item[0], reverse=True)
+                del self.slowest[SLOWEST_SQL_KEPT:]
+
+
+@contextmanager
+def timed(name):
+    """Add the enclosed time to the current request's `name` timer (outermost block only)."""
+    metrics = _current.get()
+    if metrics is None or metrics._depth.get(name):
+        yield
+        return
+    metrics._depth[name] = 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics._depth[name] = 0
+        metrics.timers[name] = metrics.timers.get(name, 0.0) + time.perf_counter() - start
+
+
+class TimedSerializerMixin:
+    """
+    Counts `serializer.data` as the request's "serialize" time. Mixed into
+    the API's own serializers; lists get it through `TimedListSerializer`
+    (their Meta.list_serializer_class).
+    """
+
+    @property
+    def data(self):
+        with timed("serialize"):
+            return super().data
+
+
+class TimedListSerializer(TimedSerializerMixin, serializers.ListSerializer):
+    pass
+
+
+# ---------- histograms ----------
+class LatencyRegistry:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._series = {}
+
+    def observe(self, view, method, seconds, queries):
+        with self._lock:
+            series = self._series.get((view, method))
+            if series is None:
+                series = self._series[(view, method)] = {
+                    "buckets": [0] * len(self.buckets), "count": 0, "sum": 0.0, "queries": 0,
+                }
+            for i, bound in enumerate(self.buckets):
+                if seconds <= bound:
+                    series["buckets"][i] += 1
+            series["count"] += 1
+            series["sum"] += seconds
+            series["queries"] += queries
+
+    def snapshot(self):
+        with self._lock:
+            return {key: {**s, "buckets": list(s["buckets"])} for key, s in self._series.items()}
+
+    def render_prometheus(self):
+        lines = [
+            "# HELP api_request_duration_seconds Request latency by view.",
+            "# TYPE api_request_duration_seconds histogram",
+        ]
+        series = sorted(self.snapshot().items())
+        for (view, method), s in series:
+            labels = f'view="{_escape(view)}",method="{method}"'
+            for bound, count in zip(self.buckets, s["buckets"]):
+                lines.append(f'api_request_duration_seconds_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'api_request_duration_seconds_bucket{{{labels},le="+Inf"}} {s["count"]}')
+            lines.append(f"api_request_duration_seconds_sum{{{labels}}} {s['sum']:.6f}")
+            lines.append(f"api_request_duration_seconds_count{{{labels}}} {s['count']}")
+        lines += [
+            "# HELP api_request_db_queries_total SQL queries run by requests, by view.",
+            "# TYPE api_request_db_queries_total counter",
+        ]
+        for (view, method), s in series:
+            lines.append(f'api_request_db_queries_total{{view="{_escape(view)}",method="{method}"}} {s["queries"]}')
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+registry = LatencyRegistry()
+
+
+# ---------- middleware ----------
+class RequestMetricsMiddleware:
+    """
+    Enabled by REQUEST_METRICS. Thresholds: SLOW_REQUEST_MS and
+    SLOW_REQUEST_QUERIES (0 disables either).
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "REQUEST_METRICS", True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_ms = getattr(settings, "SLOW_REQUEST_MS", 500)
+        self.slow_queries = getattr(settings, "SLOW_REQUEST_QUERIES", 50)
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            with self._recording(metrics):
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+
+        if response.streaming:
+            # The body (and its SQL) is produced after this returns, while
+            # the server iterates it: finish measuring when it is exhausted or closed.
+            response.streaming_content = self._measured_stream(
+                request, response.streaming_content, metrics, start,
+            )
+            return response
+
+        total = time.perf_counter() - start
+        serialize = metrics.timers.get("serialize", 0.0)
+        response["Server-Timing"] = ", ".join([
+            f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.queries} queries"',
+            f"serialize;dur={serialize * 1000:.1f}",
+            f"total;dur={total * 1000:.1f}",
+        ])
+        self._record(request, metrics, total)
+        return response
+
+    @staticmethod
+    def _recording(metrics):
+        stack = ExitStack()
+        for conn in connections.all():
+            stack.enter_context(conn.execute_wrapper(metrics.record_query))
+        return stack
+
+    def _measured_stream(self, request, content, metrics, start):
+        try:
+            with self._recording(metrics):
+                yield from content
+        finally:
+            self._record(request, metrics, time.perf_counter() - start)
+
+    def _record(self, request, metrics, total):
+        match = getattr(request, "resolver_match", None)
+        view = (match.view_name or match.route) if match else "unmatched"
+        registry.observe(view, request.method, total, metrics.queries)
+
+        too_slow = self.slow_ms and total * 1000 >= self.slow_ms
+        too_many = self.slow_queries and metrics.queries >= self.slow_queries
+        if too_slow or too_many:
+            serialize = metrics.timers.get("serialize", 0.0)
+            slowest = "\n".join(f"  {seconds * 1000:.1f} ms: {sql}" for seconds, sql in metrics.slowest)
+            logger.warning(
+                "Slow request %s %s (%s): %.1f ms total, %d queries in %.1f ms, serialize %.1f ms\n%s",
+                request.method, request.get_full_path(), view, total * 1000,
+                metrics.queries, metrics.db_time * 1000, serialize * 1000, slowest,
+            )
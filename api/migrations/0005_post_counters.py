@@ -0,0 +1,65 @@
+# Generated by Django 5.2.6 on 2025-10-16 20:45
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Post = apps.get_model("api", "Post")
+    PostUserLikes = apps.get_model("api", "PostUserLikes")
+    Comment = apps.get_model("api", "Comment")
+
+    def count(qs):
+        return Coalesce(
+            Subquery(
+                qs.order_by().values("post_id").annotate(n=Count("pk")).values("n"),
+                output_field=IntegerField(),
+            ),
+            Value(0),
+        )
+
+    likes = PostUserLikes.objects.filter(post_id=OuterRef("pk"))
+    Post.objects.update(
+        likes_count=count(likes.filter(like_type="like")),
+        dislikes_count=count(likes.filter(like_type="dislike")),
+        comments_count=count(Comment.objects.filter(post_id=OuterRef("pk"))),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_alter_post_title'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='dislikes_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['likes_count', 'id'], name='post_likes_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['dislikes_count', 'id'], name='post_dislikes_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['comments_count', 'id'], name='post_comments_count_idx'),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
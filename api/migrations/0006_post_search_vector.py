@@ -0,0 +1,59 @@
+# Generated by Django 5.2.6 on 2025-10-16 20:48
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+BACKFILL_SQL = """
+UPDATE api_post p SET search_vector =
+    setweight(to_tsvector('english', COALESCE(p.title, '')), 'A') ||
+    setweight(to_tsvector('english', COALESCE((
+        SELECT string_agg(t.name, ' ')
+        FROM api_post_tags pt JOIN api_tag t ON t.id = pt.tag_id
+        WHERE pt.post_id = p.id
+    ), '')), 'B') ||
+    setweight(to_tsvector('english', COALESCE(p.text, '')), 'C') ||
+    setweight(to_tsvector('english', COALESCE((
+        SELECT u.username
+        FROM api_userprofile up JOIN auth_user u ON u.id = up.user_id
+        WHERE up.id = p.author_id
+    ), '')), 'D')
+"""
+
+
+class PostgresOnlyAddIndex(migrations.AddIndex):
+    """GIN indexes only exist on PostgreSQL; keep the state change everywhere."""
+
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_forwards(app_label, schema_editor, from_state, to_state)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        if schema_editor.connection.vendor == "postgresql":
+            super().database_backwards(app_label, schema_editor, from_state, to_state)
+
+
+def backfill_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor == "postgresql":
+        schema_editor.execute(BACKFILL_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_post_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        PostgresOnlyAddIndex(
+            model_name='post',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='post_search_vector_gin'),
+        ),
+        migrations.RunPython(backfill_search_vector, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 5.2.6 on 2025-10-16 20:50
+
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from api.migration_operations import PostgresOnlyAddIndex
+
+
+def backfill_usage_count(apps, schema_editor):
+    Tag = apps.get_model("api", "Tag")
+    Through = apps.get_model("api", "Post").tags.through
+    Tag.objects.update(usage_count=Coalesce(
+        Subquery(
+            Through.objects.filter(tag_id=OuterRef("pk"))
+            .order_by().values("tag_id").annotate(n=Count("pk")).values("n"),
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_post_search_vector'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='tag',
+            name='usage_count',
+            field=models.PositiveIntegerField(db_index=True, default=0, editable=False),
+        ),
+        PostgresOnlyAddIndex(
+            model_name='tag',
+            index=models.Index(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Lower('name'), name='text_pattern_ops'), name='tag_name_lower_prefix_idx'),
+        ),
+        PostgresOnlyAddIndex(
+            model_name='tag',
+            index=django.contrib.postgres.indexes.GinIndex(django.contrib.postgres.indexes.OpClass(django.db.models.functions.text.Lower('name'), name='gin_trgm_ops'), name='tag_name_lower_trgm_idx'),
+        ),
+        migrations.RunPython(backfill_usage_count, migrations.RunPython.noop),
+    ]
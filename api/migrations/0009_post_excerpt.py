@@ -0,0 +1,66 @@
+# Generated by Django 5.2.6 on 2025-10-16 21:07
+
+from django.db import migrations, models
+
+BACKFILL_BATCH_SIZE = 500
+EXCERPT_LENGTH = 200
+WORDS_PER_MINUTE = 200
+
+
+def text_stats(text):
+    # Frozen copy of api.models.text_stats as of this migration.
+    words = (text or "").split()
+    excerpt = " ".join(words)
+    if len(excerpt) > EXCERPT_LENGTH:
+        cut = excerpt[:EXCERPT_LENGTH + 1]
+        space = cut.rfind(" ")
+        excerpt = (cut[:space] if space > EXCERPT_LENGTH // 2 else cut[:EXCERPT_LENGTH]).rstrip() + "…"
+    return {
+        "excerpt": excerpt,
+        "word_count": len(words),
+        "reading_time": -(-len(words) // WORDS_PER_MINUTE),
+    }
+
+
+def backfill_text_stats(apps, schema_editor):
+    # Id-ordered batches loading only id + text; `manage.py backfill_post_excerpts`
+    # does the same for rows written later by paths that skip Post.save.
+    Post = apps.get_model("api", "Post")
+    last_id = 0
+    while True:
+        batch = list(
+            Post.objects.filter(pk__gt=last_id).order_by("pk").only("id", "text")[:BACKFILL_BATCH_SIZE]
+        )
+        if not batch:
+            break
+        last_id = batch[-1].pk
+        for post in batch:
+            for field, value in text_stats(post.text).items():
+                setattr(post, field, value)
+        Post.objects.bulk_update(batch, ["excerpt", "word_count", "reading_time"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_comment_post_created_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='excerpt',
+            field=models.CharField(blank=True, default='', editable=False, max_length=201),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='reading_time',
+            field=models.PositiveSmallIntegerField(default=0, editable=False, help_text='Minutes.'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_text_stats, migrations.RunPython.noop),
+    ]
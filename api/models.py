@@ -1,5 +1,7 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.search import SearchVectorField
 from django.core.validators import MinLengthValidator, RegexValidator
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.models import User
 from django.db.models.functions import Lower
 
@@ -38,6 +40,8 @@ class UserProfile(models.Model):
 
 class Tag(models.Model):
     name = models.CharField(max_length=40, unique=False, db_index=True)
+    # Number of posts carrying this tag, maintained by api.signals.
+    usage_count = models.PositiveIntegerField(default=0, editable=False, db_index=True)
 
     class Meta:
         constraints = [
@@ -46,12 +50,24 @@ class Tag(models.Model):
                 name="uniq_tag_name_ci",
             )
         ]
+        indexes = [
+            # LOWER(name) LIKE 'py%' (prefix) and LIKE '%py%' (trigram) lookups.
+            models.Index(OpClass(Lower("name"), name="text_pattern_ops"), name="tag_name_lower_prefix_idx"),
+            GinIndex(OpClass(Lower("name"), name="gin_trgm_ops"), name="tag_name_lower_trgm_idx"),
+        ]
         ordering = ["name"]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
     def save(self, *args, **kwargs):
         if self.name:
             self.name = self.name.strip()
         super().save(*args, **kwargs)
+        self._loaded_values = {"name": self.name}
 
     def __str__(self):
         return f'{self.name}'
@@ -59,6 +75,26 @@ class Tag(models.Model):
 
 # ---- Posts -----
 
+EXCERPT_LENGTH = 200
+WORDS_PER_MINUTE = 200
+
+
+def text_stats(text):
+    """excerpt / word_count / reading_time (minutes, at least 1 for non-empty text)."""
+    words = (text or "").split()
+    excerpt = " ".join(words)
+    if len(excerpt) > EXCERPT_LENGTH:
+        cut = excerpt[:EXCERPT_LENGTH + 1]
+        # Break on a word boundary unless that leaves too little.
+        space = cut.rfind(" ")
+        excerpt = (cut[:space] if space > EXCERPT_LENGTH // 2 else cut[:EXCERPT_LENGTH]).rstrip() + "…"
+    return {
+        "excerpt": excerpt,
+        "word_count": len(words),
+        "reading_time": -(-len(words) // WORDS_PER_MINUTE),
+    }
+
+
 STATUS_CHOICES = (
     ('draft', 'Draft'),
     ('published', 'Published'),
@@ -85,13 +121,60 @@ class Post(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, db_index=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    # Denormalized counters, maintained by api.signals with F() updates.
+    # Repair drift with `manage.py recount_post_counters`.
+    likes_count = models.PositiveIntegerField(default=0, editable=False)
+    dislikes_count = models.PositiveIntegerField(default=0, editable=False)
+    comments_count = models.PositiveIntegerField(default=0, editable=False)
+
+    # Weighted full-text document (title > tags > text > author), maintained
+    # by api.signals on PostgreSQL. See api.search.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    # Derived from `text` on every save, so lists never need the full body.
+    # Filled for existing rows by migration 0009; repair rows written by paths
+    # that skip save() with `manage.py backfill_post_excerpts`.
+    excerpt = models.CharField(max_length=EXCERPT_LENGTH + 1, blank=True, default="", editable=False)
+    word_count = models.PositiveIntegerField(default=0, editable=False)
+    reading_time = models.PositiveSmallIntegerField(default=0, editable=False, help_text="Minutes.")
+
     class Meta:
         ordering = ["-id"]  
+        indexes = [
+            models.Index(fields=["likes_count", "id"], name="post_likes_count_idx"),
+            models.Index(fields=["dislikes_count", "id"], name="post_dislikes_count_idx"),
+            models.Index(fields=["comments_count", "id"], name="post_comments_count_idx"),
+            GinIndex(fields=["search_vector"], name="post_search_vector_gin"),
+        ]
+
+    def save(self, *args, **kwargs):
+        # Never write back counters or the search vector loaded earlier: they
+        # are maintained by UPDATEs that may have run since this instance was read.
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in POST_MAINTAINED_FIELDS
+            ]
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None or "text" in update_fields:
+            self.refresh_text_stats()
+            if update_fields is not None:
+                kwargs["update_fields"] = list(dict.fromkeys([*update_fields, *POST_TEXT_STATS_FIELDS]))
+        super().save(*args, **kwargs)
+
+    def refresh_text_stats(self):
+        for field, value in text_stats(self.text).items():
+            setattr(self, field, value)
 
     def __str__(self):
         return f'Post: {self.title} by {self.author.user.username}'
 
 
+POST_COUNTER_FIELDS = ("likes_count", "dislikes_count", "comments_count")
+POST_MAINTAINED_FIELDS = POST_COUNTER_FIELDS + ("search_vector",)
+POST_TEXT_STATS_FIELDS = ("excerpt", "word_count", "reading_time")
+
+
 # ---- Comments ------
 
 class Comment(models.Model):
@@ -114,6 +197,22 @@ class Comment(models.Model):
 
     class Meta:
         ordering = ["-id"]
+        indexes = [
+            # Newest comments per post (comment previews).
+            models.Index(fields=["post", "created_at"], name="comment_post_created_idx"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Counter updates run from post_save; keep them in the same transaction.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+        self._loaded_values = {"post_id": self.post_id}
 
     def __str__(self):
         return f'Comment by {self.author.user.username} on {self.post.title}'
@@ -153,5 +252,17 @@ class PostUserLikes(models.Model):
         ]
         ordering = ["-id"]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Counter updates run from post_save; keep them in the same transaction.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+        self._loaded_values = {"post_id": self.post_id, "like_type": self.like_type}
+
     def __str__(self):
         return f"{self.user.username} {self.like_type}d {self.post.title}"
@@ -0,0 +1,185 @@
+import base64
+import json
+from datetime import date, datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset ("seek") pagination on (<ordering field>, id).
+
+    Each page is fetched with `WHERE (field, id) < (last_field, last_id)`
+    instead of OFFSET, so page 10,000 costs the same as page 1, no COUNT(*)
+    is issued, and rows inserted concurrently never shift or duplicate
+    items between pages. The ordering field comes from the queryset's
+    ordering (e.g. `?ordering=-likes_count`) and must be listed in the view's
+    `cursor_ordering_fields`.
+    """
+    cursor_query_param = "cursor"
+    page_size = None
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self, page_size=None):
+        self.page_size = page_size or self.page_size or api_settings.PAGE_SIZE
+
+    # ---------- cursor encoding ----------
+    def encode_cursor(self, value, pk, reverse=False):
+        if isinstance(value, (datetime, date)):
+            value = value.isoformat()
+        payload = {"v": value, "id": pk}
+        if reverse:
+            payload["r"] = 1
+        raw = json.dumps(payload, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode_cursor(self, request, model, field):
+        encoded = request.query_params.get(self.cursor_query_param, "").strip()
+        if not encoded:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4))
+            payload = json.loads(raw)
+            value = model._meta.get_field(field).to_python(payload["v"])
+            pk = int(payload["id"])
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+        return value, pk, bool(payload.get("r"))
+
+    # ---------- ordering ----------
+    def get_ordering(self, queryset, view):
+        """Return (field, descending) for the first ordering term."""
+        ordering = list(queryset.query.order_by) or list(getattr(view, "ordering", None) or []) \
+            or list(queryset.model._meta.ordering)
+        term = str(ordering[0]) if ordering else "-id"
+        descending = term.startswith("-")
+        field = term.lstrip("-")
+        if field == "pk":
+            field = "id"
+
+        allowed = list(getattr(view, "cursor_ordering_fields", None) or []) + ["id"]
+        if field not in allowed:
+            raise ValidationError({
+                "ordering": [f"Cursor pagination supports ordering by: {', '.join(sorted(set(allowed)))}."]
+            })
+        return field, descending
+
+    @staticmethod
+    def _seek(field, descending, value, pk):
+        # The redundant outer bound lets the planner use a range scan on the
+        # (field, id) index instead of evaluating the OR across the table.
+        op = "lt" if descending else "gt"
+        edge = "lte" if descending else "gte"
+        if field == "id":
+            return Q(**{f"id__{op}": pk})
+        return Q(**{f"{field}__{edge}": value}) & (
+            Q(**{f"{field}__{op}": value}) | Q(**{field: value, f"id__{op}": pk})
+        )
+
+    # ---------- BasePagination API ----------
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        field, descending = self.get_ordering(queryset, view)
+        self.field = field
+        self.descending = descending
+
+        cursor = self.decode_cursor(request, queryset.model, field)
+        reverse = bool(cursor and cursor[2])
+        scan_desc = descending != reverse
+
+        prefix = "-" if scan_desc else ""
+        order = [f"{prefix}{field}"] + ([f"{prefix}id"] if field != "id" else [])
+        qs = queryset.order_by(*order)
+        if cursor:
+            qs = qs.filter(self._seek(field, scan_desc, cursor[0], cursor[1]))
+
+        rows = list(qs[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if reverse:
+            rows.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, cursor is not None
+
+        self.page = rows
+        return rows
+
+    def _position(self, row):
+        if isinstance(row, dict):
+            return row[self.field], row["id"]
+        return getattr(row, self.field), row.pk
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        value, pk = self._position(self.page[-1])
+        return replace_query_param(self.base_url, self.cursor_query_param, self.encode_cursor(value, pk))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.base_url, self.cursor_query_param)
+        value, pk = self._position(self.page[0])
+        return replace_query_param(
+            self.base_url, self.cursor_query_param, self.encode_cursor(value, pk, reverse=True)
+        )
+
+    def get_paginated_response(self, data):
+        return Response({
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "results": data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+class PageOrCursorPagination(BasePagination):
+    """
+    Page-number pagination by default (`?page=N`, with a total `count`);
+    switches to keyset pagination when the request carries `?cursor=`
+    (empty for the first page, then follow `next`/`previous`).
+    """
+    page_class = PageNumberPagination
+    cursor_class = KeysetPagination
+
+    def _delegate(self, request):
+        if not hasattr(self, "_impl"):
+            use_cursor = self.cursor_class.cursor_query_param in request.query_params
+            self._impl = (self.cursor_class if use_cursor else self.page_class)()
+        return self._impl
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self._delegate(request).paginate_queryset(queryset, request, view=view)
+
+    def get_paginated_response(self, data):
+        return self._impl.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.page_class().get_paginated_response_schema(schema)
+
+    def get_schema_operation_parameters(self, view):
+        return self.page_class().get_schema_operation_parameters(view) + [{
+            "name": self.cursor_class.cursor_query_param,
+            "required": False,
+            "in": "query",
+            "description": "Keyset cursor. Pass empty to start cursor mode, then follow `next`/`previous`.",
+            "schema": {"type": "string"},
+        }]
@@ -18,6 +18,14 @@ def current_profile_id(user):
     except Exception:
         return None
 
+def current_profile(user):
+    try:
+        if not user or not user.is_authenticated:
+            return None
+        return getattr(user, "profile", None) or getattr(user, "userprofile", None)
+    except Exception:
+        return None
+
 
 # --- Posts ---
 class PostsPermission(BasePermission):
@@ -0,0 +1,165 @@
+"""
+Bulk post import from NDJSON: one {"title", "text", "author", "tags"} object
+per line, with `author` a username and `tags` tag names or ids (as accepted
+by `tag_inputs`). Used by POST /api/posts/import/ and `manage.py import_posts`.
+
+Lines are handled in chunks. Per chunk: each row is validated in Python,
+authors, duplicate titles and tags are looked up with one query each, and
+the valid rows go in with one bulk_create for posts and one for the tag
+through table. Invalid rows are reported and skipped. A chunk is written in
+its own transaction, so it lands complete or not at all.
+
+bulk_create skips the signals that maintain tag usage counts, search
+vectors and response cache versions, so they are updated here per chunk.
+"""
+import json
+from collections import Counter, defaultdict
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from rest_framework import serializers
+
+from api.cache import bump_response_cache
+from api.models import Post, Tag, UserProfile
+from api.search import refresh_search_vectors
+from api.serializers import resolve_tag_values
+from api.tag_index import bump_tag_index_version
+
+DEFAULT_CHUNK_SIZE = 500
+
+
+class PostImportRowSerializer(serializers.Serializer):
+    """Field checks only: uniqueness, authors and tags are checked per chunk."""
+    title = serializers.CharField(max_length=100, min_length=2)
+    text = serializers.CharField(min_length=5, trim_whitespace=False)
+    author = serializers.CharField(required=False, allow_blank=True)
+    tags = serializers.ListField(
+        child=serializers.CharField(max_length=Tag._meta.get_field("name").max_length),
+        allow_empty=False,
+    )
+
+
+def _parse_lines(lines):
+    """Yield (line number, payload or None, errors or None), skipping blank lines."""
+    for number, line in enumerate(lines, start=1):
+        if isinstance(line, bytes):
+            line = line.decode("utf-8", errors="replace")
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            payload = json.loads(line)
+        except ValueError as exc:
+            yield number, None, {"non_field_errors": [f"Invalid JSON: {exc}"]}
+            continue
+        if not isinstance(payload, dict):
+            yield number, None, {"non_field_errors": ["Expected a JSON object."]}
+            continue
+        yield number, payload, None
+
+
+def _validate_chunk(chunk, default_author):
+    """
+    Split a chunk into ([(line, validated data, author)], [error dicts])
+    with one query for authors and one for existing titles.
+    """
+    errors, candidates = [], []
+    for number, payload, parse_errors in chunk:
+        if parse_errors:
+            errors.append({"line": number, "errors": parse_errors})
+            continue
+        ser = PostImportRowSerializer(data=payload)
+        if not ser.is_valid():
+            errors.append({"line": number, "errors": ser.errors})
+            continue
+        candidates.append((number, ser.validated_data))
+
+    usernames = {d["author"] for _, d in candidates if d.get("author")}
+    profiles = {
+        p.user.username: p
+        for p in UserProfile.objects.select_related("user").filter(user__username__in=usernames)
+    } if usernames else {}
+    taken = set(
+        Post.objects.filter(title__in=[d["title"] for _, d in candidates])
+        .values_list("title", flat=True)
+    )
+
+    valid = []
+    for number, data in candidates:
+        username = data.get("author")
+        author = profiles.get(username) if username else default_author
+        if author is None:
+            message = f"Unknown user: {username}" if username else "This field is required."
+            errors.append({"line": number, "errors": {"author": [message]}})
+        elif data["title"] in taken:
+            errors.append({"line": number, "errors": {"title": ["A post with this title already exists."]}})
+        else:
+            taken.add(data["title"])
+            valid.append((number, data, author))
+    return valid, errors
+
+
+def _insert_chunk(valid):
+    """Write one chunk of validated rows; all or nothing. Returns the created posts."""
+    through = Post.tags.through
+    with transaction.atomic():
+        by_raw = resolve_tag_values([name for _, data, _ in valid for name in data["tags"]])
+
+        posts = []
+        for _, data, author in valid:
+            post = Post(author=author, title=data["title"], text=data["text"])
+            post.refresh_text_stats()
+            posts.append(post)
+        Post.objects.bulk_create(posts)
+
+        links = []
+        for post, (_, data, _) in zip(posts, valid):
+            tag_ids = {by_raw[name.strip()].pk for name in data["tags"] if name.strip() in by_raw}
+            links.extend(through(post_id=post.pk, tag_id=tag_id) for tag_id in tag_ids)
+        through.objects.bulk_create(links)
+
+        # One UPDATE per distinct increment rather than per tag.
+        per_tag = Counter(link.tag_id for link in links)
+        by_delta = defaultdict(list)
+        for tag_id, delta in per_tag.items():
+            by_delta[delta].append(tag_id)
+        for delta, tag_ids in by_delta.items():
+            Tag.objects.filter(pk__in=tag_ids).update(usage_count=F("usage_count") + delta)
+
+        refresh_search_vectors([p.pk for p in posts])
+        bump_tag_index_version()
+        bump_response_cache("posts", "tags")
+    return posts
+
+
+def import_posts(lines, default_author=None, chunk_size=DEFAULT_CHUNK_SIZE, dry_run=False, on_chunk=None):
+    """
+    Import NDJSON `lines` (str or bytes). Rows without "author" are credited
+    to `default_author` (a UserProfile). Returns
+    {"created", "failed", "errors": [{"line", "errors"}], "dry_run"}.
+    `on_chunk(report)` is called after every chunk, for progress output.
+    """
+    report = {"created": 0, "failed": 0, "errors": [], "dry_run": dry_run}
+    rows = _parse_lines(lines)
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        valid, errors = _validate_chunk(chunk, default_author)
+        if valid and not dry_run:
+            try:
+                _insert_chunk(valid)
+            except IntegrityError as exc:
+                # A concurrent writer took a title between validation and insert.
+                errors.extend(
+                    {"line": number, "errors": {"non_field_errors": [f"Chunk rolled back: {exc}"]}}
+                    for number, _, _ in valid
+                )
+                valid = []
+        report["created"] += len(valid)
+        report["failed"] += len(errors)
+        report["errors"].extend(sorted(errors, key=lambda e: e["line"]))
+        if on_chunk:
+            on_chunk(report)
+    return report
@@ -0,0 +1,187 @@
+"""
+On-demand request profiler for managers/staff.
+
+Add `?__profile=1` (or the `X-Profile: 1` header) to any request to run it
+under cProfile with every SQL statement captured; the slowest SELECTs are
+then re-run under EXPLAIN ANALYZE. The report (text) replaces the normal
+response, or with `?__profile=save` / `X-Profile: save` is written to
+PROFILE_DIR and the normal response comes back with an `X-Profile-Report`
+header naming the file.
+
+Guard rails, so the switch cannot be turned into a load generator: only
+managers/staff (session or JWT) can trigger it, each of them at most
+PROFILE_MAX_PER_MINUTE times, one profiled request per process at a time,
+at most PROFILE_MAX_EXPLAINS plans per request, each under
+PROFILE_EXPLAIN_TIMEOUT_MS on PostgreSQL. Other requests pass straight through.
+"""
+import cProfile
+import io
+import pstats
+import re
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.utils import timezone
+
+from api.permissions import is_manager
+
+PARAM = "__profile"
+HEADER = "HTTP_X_PROFILE"
+MAX_CAPTURED_SQL = 500
+STATS_LINES = 40
+RATE_KEY = "profile:rate:{}:{}"
+
+_busy = threading.Lock()
+
+
+def _requested_mode(request):
+    """None, "inline" or "save"."""
+    raw = request.GET.get(PARAM) or request.META.get(HEADER) or ""
+    raw = raw.strip().lower()
+    if raw in ("1", "true", "yes", "inline"):
+        return "inline"
+    if raw == "save":
+        return "save"
+    return None
+
+
+def _profiling_user(request):
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        return user
+    # The API authenticates with JWT inside DRF, after middleware has run.
+    from rest_framework_simplejwt.authentication import JWTAuthentication
+    try:
+        result = JWTAuthentication().authenticate(request)
+    except Exception:
+        return None
+    return result[0] if result else None
+
+
+def _take_slot(user):
+    """Per-user fixed-window limit; True if this request may be profiled."""
+    limit = getattr(settings, "PROFILE_MAX_PER_MINUTE", 6)
+    key = RATE_KEY.format(user.pk, int(time.time() // 60))
+    if cache.add(key, 1, timeout=120):
+        return limit >= 1
+    try:
+        return cache.incr(key) <= limit
+    except ValueError:
+        return False
+
+
+class _SQLRecorder:
+    def __init__(self):
+        self.statements = []  # [(seconds, sql, params, many)]
+        self.total = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.total += 1
+            if len(self.statements) < MAX_CAPTURED_SQL:
+                self.statements.append((time.perf_counter() - start, sql, params, many))
+
+
+def explain(sql, params):
+    """Execution plan of one captured SELECT (EXPLAIN ANALYZE on PostgreSQL)."""
+    with transaction.atomic(), connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            timeout = int(getattr(settings, "PROFILE_EXPLAIN_TIMEOUT_MS", 5000))
+            cursor.execute(f"SET LOCAL statement_timeout = {timeout}")
+            cursor.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT TEXT) " + sql, params)
+            return "\n".join(row[0] for row in cursor.fetchall())
+        if connection.vendor == "sqlite":
+            cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+            return "\n".join(str(row[-1]) for row in cursor.fetchall())
+        cursor.execute("EXPLAIN " + sql, params)
+        return "\n".join(" ".join(map(str, row)) for row in cursor.fetchall())
+
+
+def build_report(request, response, profile, recorder, elapsed):
+    out = io.StringIO()
+    out.write(f"{request.method} {request.get_full_path()} -> {response.status_code}\n")
+    out.write(f"profiled at {timezone.now().isoformat()}, {elapsed * 1000:.1f} ms (with profiler overhead)\n")
+    sql_time = sum(s[0] for s in recorder.statements)
+    out.write(f"{recorder.total} SQL statements, {sql_time * 1000:.1f} ms\n\n")
+
+    out.write("=== cProfile (top by cumulative time) ===\n")
+    stats = pstats.Stats(profile, stream=out)
+    stats.strip_dirs().sort_stats("cumulative").print_stats(STATS_LINES)
+
+    out.write("\n=== SQL (in execution order) ===\n")
+    for i, (seconds, sql, params, many) in enumerate(recorder.statements, start=1):
+        shown = f"{len(params)} parameter sets" if many else repr(params)
+        out.write(f"[{i}] {seconds * 1000:.2f} ms\n{sql}\n  params: {shown}\n")
+    if recorder.total > len(recorder.statements):
+        out.write(f"... {recorder.total - len(recorder.statements)} more not captured\n")
+
+    out.write("\n=== Plans of the slowest SELECTs ===\n")
+    limit = int(getattr(settings, "PROFILE_MAX_EXPLAINS", 5))
+    selects = [s for s in recorder.statements if not s[3] and s[1].lstrip().upper().startswith("SELECT")]
+    for seconds, sql, params, _ in sorted(selects, key=lambda s: s[0], reverse=True)[:limit]:
+        out.write(f"\n--- {seconds * 1000:.2f} ms: {sql[:200]}{'…' if len(sql) > 200 else ''}\n")
+        try:
+            out.write(explain(sql, params) + "\n")
+        except Exception as exc:
+            out.write(f"(EXPLAIN failed: {exc})\n")
+    return out.getvalue()
+
+
+def save_report(request, report):
+    directory = Path(getattr(settings, "PROFILE_DIR", "profiles"))
+    directory.mkdir(parents=True, exist_ok=True)
+    slug = re.sub(r"[^A-Za-z0-9]+", "-", request.path).strip("-")[:80] or "root"
+    name = f"{timezone.now():%Y%m%d-%H%M%S-%f}-{request.method.lower()}-{slug}.txt"
+    (directory / name).write_text(report, encoding="utf-8")
+    return name
+
+
+class RequestProfilerMiddleware:
+    """Enabled by REQUEST_PROFILING; see the module docstring."""
+
+    def __init__(self, get_response):
+        if not getattr(settings, "REQUEST_PROFILING", True):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = _requested_mode(request)
+        if mode is None:
+            return self.get_response(request)
+
+        user = _profiling_user(request)
+        if user is None or not is_manager(user):
+            return self.get_response(request)
+        if not _take_slot(user) or not _busy.acquire(blocking=False):
+            response = self.get_response(request)
+            response["X-Profile"] = "skipped (rate limit or another profile running)"
+            return response
+
+        try:
+            recorder = _SQLRecorder()
+            profile = cProfile.Profile()
+            start = time.perf_counter()
+            with connection.execute_wrapper(recorder):
+                profile.enable()
+                try:
+                    response = self.get_response(request)
+                finally:
+                    profile.disable()
+            elapsed = time.perf_counter() - start
+            report = build_report(request, response, profile, recorder, elapsed)
+        finally:
+            _busy.release()
+
+        if mode == "save":
+            response["X-Profile-Report"] = save_report(request, report)
+            return response
+        return HttpResponse(report, content_type="text/plain; charset=utf-8")
@@ -0,0 +1,401 @@
+"""
+Write-behind buffer for reactions (settings.REACTION_WRITE_BEHIND).
+
+Instead of writing PostUserLikes and the post counters on every click, the
+reaction endpoint appends an event to a log kept in the Django cache and
+answers right away. `flush_reaction_buffer()` (run by the `flush_reactions`
+command, or by an in-process thread with REACTION_FLUSH_THREAD) applies the
+log in batches: one upsert, one delete and one counter UPDATE per touched
+post, whatever the number of clicks.
+
+Layout in the cache:
+  reactbuf:seq           last event id handed out (INCR)
+  reactbuf:cursor        last event id applied to the database
+  reactbuf:e:<id>        (profile_id, post_id, like_type or None, unix time)
+  reactbuf:p:<prof>:<post>  (like_type or None, event id): read-your-writes overlay
+  reactbuf:pl:<prof>:<post> short lock serializing one viewer's clicks on a post
+
+Events carry the absolute target state, so applying one twice is harmless.
+The cursor only moves after the batch has committed and events are only
+deleted after that, which makes crash recovery a plain replay: a flusher
+that starts up resumes from the cursor and re-applies anything that may
+not have made it. Flushers take a token lock in the cache, renewed every
+batch; on Postgres each batch is also applied under an advisory lock and
+only if the cursor has not moved since it was read, so a flusher that lost
+its lock can neither apply a stale batch nor move the cursor back.
+
+The buffer must live in a cache every process shares, with an atomic INCR
+(Redis or Memcached, see REDIS_URL); `check_cache_backend()` refuses to
+start otherwise.
+"""
+import logging
+import secrets
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import close_old_connections, connections, transaction
+from django.db.models import OuterRef, Q, Subquery
+
+from api.cache import bump_response_cache
+from api.counters import REACTION_COUNTERS, bump_post_counters
+from api.models import Post, PostUserLikes, UserProfile
+
+logger = logging.getLogger(__name__)
+
+SEQ_KEY = "reactbuf:seq"
+CURSOR_KEY = "reactbuf:cursor"
+LOCK_KEY = "reactbuf:lock"
+GAP_KEY = "reactbuf:gap"
+EVENT_KEY = "reactbuf:e:{}"
+PENDING_KEY = "reactbuf:p:{}:{}"
+PENDING_LOCK_KEY = "reactbuf:pl:{}:{}"
+VIEWER_KEY = "reactbuf:u:{}"
+
+# The overlay only has to outlive the next flush.
+PENDING_TIMEOUT = 600
+# Clicks on the same post by the same viewer wait this long for each other.
+PENDING_LOCK_WAIT = 1.0
+LOCK_TIMEOUT = 60
+# pg_advisory_lock() key serializing batch application ("reactbuf").
+APPLY_LOCK_ID = 0x7265616374627566
+# An id handed out by INCR whose event is not stored yet is normally a
+# request still in flight; give up on it after this long.
+GAP_GRACE = 5.0
+# Cache backends visible to every process, with an atomic INCR.
+SHARED_CACHE_BACKENDS = ("redis", "memcached")
+
+
+def write_behind_enabled():
+    return getattr(settings, "REACTION_WRITE_BEHIND", False)
+
+
+def check_cache_backend():
+    """
+    Raise ImproperlyConfigured when write-behind is on but the default cache
+    is private to one process (local memory, dummy) or cannot INCR atomically
+    (file, database): buffered reactions would be acknowledged, then lost.
+    """
+    if not write_behind_enabled():
+        return
+    backend = settings.CACHES.get("default", {}).get("BACKEND", "")
+    if not any(name in backend.lower() for name in SHARED_CACHE_BACKENDS):
+        raise ImproperlyConfigured(
+            f"REACTION_WRITE_BEHIND needs a shared Redis or Memcached cache (set REDIS_URL); "
+            f"the default cache is {backend or 'not configured'}."
+        )
+
+
+# ---------- write path ----------
+def buffer_reaction(profile, post_id, reaction, toggle=False, keep_existing=False):
+    """
+    Record the viewer's new reaction in the buffer. Same arguments and result
+    as `api.reactions.set_reaction`, plus "pending": True and "changed"
+    (whether anything was buffered); counts are the stored ones adjusted for
+    the viewer's own change. With `keep_existing`, a reaction the viewer
+    already has is left alone. Costs one indexed read.
+    """
+    row = (
+        Post.objects.filter(pk=post_id)
+        .annotate(stored=Subquery(
+            PostUserLikes.objects.filter(post=OuterRef("pk"), user=profile).values("like_type")[:1]
+        ))
+        .values_list("likes_count", "dislikes_count", "comments_count", "stored")
+        .first()
+    )
+    if row is None:
+        return None
+    likes, dislikes, comments, stored = row
+
+    with _pending_lock(profile.pk, post_id):
+        current = pending_reactions(profile.pk, [post_id]).get(post_id, stored)
+        if reaction is None or (toggle and current == reaction):
+            state = None
+        elif keep_existing and current:
+            state = current
+        else:
+            state = reaction
+
+        if state != current:
+            event_id = _next_event_id()
+            cache.set(EVENT_KEY.format(event_id), (profile.pk, post_id, state, time.time()), timeout=None)
+            _set_pending(profile.pk, post_id, state, event_id)
+            _ensure_flusher_thread()
+
+    counts = {"likes_count": likes, "dislikes_count": dislikes}
+    for like_type, delta in ((stored, -1), (state, 1)):
+        if like_type:
+            field = REACTION_COUNTERS[like_type]
+            counts[field] = max(counts[field] + delta, 0)
+    return {
+        "post": post_id,
+        "reaction": state,
+        **counts,
+        "comments_count": comments,
+        "pending": True,
+        "changed": state != current,
+    }
+
+
+@contextmanager
+def _pending_lock(profile_id, post_id):
+    """
+    Serialize one viewer's clicks on one post, so each starts from the state
+    the previous one left and the overlay follows event order. A holder that
+    died is waited out after PENDING_LOCK_WAIT.
+    """
+    key = PENDING_LOCK_KEY.format(profile_id, post_id)
+    token = secrets.token_hex(8)
+    deadline = time.monotonic() + PENDING_LOCK_WAIT
+    while not cache.add(key, token, timeout=PENDING_LOCK_WAIT) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    try:
+        yield
+    finally:
+        if cache.get(key) == token:
+            cache.delete(key)
+
+
+def _set_pending(profile_id, post_id, state, event_id):
+    # Never replace the overlay of a later event with an earlier one.
+    key = PENDING_KEY.format(profile_id, post_id)
+    found = cache.get(key)
+    if found is None or found[1] < event_id:
+        cache.set(key, (state, event_id), timeout=PENDING_TIMEOUT)
+    viewer_key = VIEWER_KEY.format(profile_id)
+    if cache.get(viewer_key, 0) < event_id:
+        cache.set(viewer_key, event_id, timeout=PENDING_TIMEOUT)
+
+
+def _next_event_id():
+    try:
+        return cache.incr(SEQ_KEY)
+    except ValueError:
+        cache.add(SEQ_KEY, 0, timeout=None)
+        return cache.incr(SEQ_KEY)
+
+
+# ---------- read path ----------
+def pending_reactions(profile_id, post_ids):
+    """{post_id: like_type or None} for the viewer's not yet applied reactions."""
+    if not write_behind_enabled() or profile_id is None or not post_ids:
+        return {}
+    keys = {PENDING_KEY.format(profile_id, pid): pid for pid in post_ids}
+    found = cache.get_many([CURSOR_KEY, *keys])
+    applied = found.pop(CURSOR_KEY, 0)
+    return {
+        keys[key]: state
+        for key, (state, event_id) in found.items()
+        if event_id > applied
+    }
+
+
+def merge_pending(profile_id, reactions, post_ids):
+    """Overlay pending reactions on a {post_id: like_type} map, in place."""
+    for post_id, state in pending_reactions(profile_id, post_ids).items():
+        if state is None:
+            reactions.pop(post_id, None)
+        else:
+            reactions[post_id] = state
+    return reactions
+
+
+def viewer_marker(profile_id):
+    """Changes whenever the viewer buffers a reaction (for per-viewer ETags)."""
+    if not write_behind_enabled() or profile_id is None:
+        return ""
+    return cache.get(VIEWER_KEY.format(profile_id), "")
+
+
+# ---------- flush ----------
+def flush_reaction_buffer(batch_size=500):
+    """
+    Apply buffered events to the database, oldest first, in batches of
+    `batch_size`. Returns the number of events consumed. Only one flusher
+    runs at a time; others return 0 immediately, and one that finds its
+    lock taken over (it stalled past LOCK_TIMEOUT) stops before its next batch.
+    """
+    token = secrets.token_hex(16)
+    if not cache.add(LOCK_KEY, token, timeout=LOCK_TIMEOUT):
+        return 0
+    consumed = 0
+    try:
+        while _renew_lock(token):
+            cursor = cache.get(CURSOR_KEY, 0)
+            head = cache.get(SEQ_KEY, 0)
+            if head <= cursor:
+                break
+            ids = range(cursor + 1, min(head, cursor + batch_size) + 1)
+            found = cache.get_many([EVENT_KEY.format(n) for n in ids])
+
+            states, last = {}, cursor
+            for n in ids:
+                event = found.get(EVENT_KEY.format(n))
+                if event is None:
+                    if not _gap_expired(n, head):
+                        break
+                    logger.warning("Reaction buffer: event %s is missing, skipping it.", n)
+                else:
+                    profile_id, post_id, state = event[:3]
+                    # Later events win; re-inserting keeps the dict in log order.
+                    states.pop((profile_id, post_id), None)
+                    states[(profile_id, post_id)] = state
+                last = n
+            if last == cursor:
+                break
+
+            with _apply_lock():
+                if cache.get(CURSOR_KEY, 0) != cursor:
+                    # Another flusher applied this batch meanwhile: start over from its cursor.
+                    continue
+                if states:
+                    apply_reaction_states(states)
+                cache.set(CURSOR_KEY, last, timeout=None)
+            cache.delete_many([EVENT_KEY.format(n) for n in range(cursor + 1, last + 1)])
+            consumed += last - cursor
+            if last < ids[-1]:
+                break
+    finally:
+        _release_lock(token)
+    return consumed
+
+
+def _renew_lock(token):
+    if cache.get(LOCK_KEY) != token:
+        logger.warning("Reaction buffer: flush lock was taken over, stopping.")
+        return False
+    cache.touch(LOCK_KEY, LOCK_TIMEOUT)
+    return True
+
+
+def _release_lock(token):
+    # Never delete a lock another flusher acquired after ours expired.
+    if cache.get(LOCK_KEY) == token:
+        cache.delete(LOCK_KEY)
+
+
+@contextmanager
+def _apply_lock():
+    """
+    Session advisory lock around applying a batch and moving the cursor, so
+    two flushers never interleave even if the cache lock expired under one
+    of them. A no-op off Postgres.
+    """
+    connection = connections[PostUserLikes.objects.db]
+    if connection.vendor != "postgresql":
+        yield
+        return
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT pg_advisory_lock(%s)", [APPLY_LOCK_ID])
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_advisory_unlock(%s)", [APPLY_LOCK_ID])
+
+
+def _gap_expired(event_id, head):
+    # Remember when the head was first seen at or past the missing id: the id
+    # was handed out no later than that, so after GAP_GRACE it is abandoned.
+    now = time.time()
+    seen = cache.get(GAP_KEY)
+    if seen is None or event_id > seen[1]:
+        cache.set(GAP_KEY, (now, head), timeout=None)
+        return False
+    return now - seen[0] >= GAP_GRACE
+
+
+def apply_reaction_states(states):
+    """
+    Bring PostUserLikes in line with {(profile_id, post_id): like_type or None}
+    and apply the resulting counter deltas, in one transaction. Bulk queries
+    skip the model signals, so counters and cache bumps are done here.
+    """
+    with transaction.atomic():
+        pairs = Q()
+        for profile_id, post_id in states:
+            pairs |= Q(user_id=profile_id, post_id=post_id)
+        current = {
+            (user_id, post_id): (pk, like_type)
+            for pk, user_id, post_id, like_type in (
+                PostUserLikes.objects.select_for_update().filter(pairs)
+                .values_list("pk", "user_id", "post_id", "like_type")
+            )
+        }
+        # Posts or profiles deleted since the click are dropped.
+        live_posts = set(Post.objects.filter(pk__in={p for _, p in states}).values_list("pk", flat=True))
+        live_profiles = set(UserProfile.objects.filter(pk__in={u for u, _ in states}).values_list("pk", flat=True))
+
+        upserts, delete_ids = [], []
+        deltas = defaultdict(lambda: defaultdict(int))
+        for (profile_id, post_id), state in states.items():
+            pk, old = current.get((profile_id, post_id), (None, None))
+            if old == state or post_id not in live_posts or profile_id not in live_profiles:
+                continue
+            if old:
+                deltas[post_id][REACTION_COUNTERS[old]] -= 1
+            if state:
+                deltas[post_id][REACTION_COUNTERS[state]] += 1
+                upserts.append(PostUserLikes(user_id=profile_id, post_id=post_id, like_type=state))
+            else:
+                delete_ids.append(pk)
+
+        if upserts:
+            PostUserLikes.objects.bulk_create(
+                upserts,
+                update_conflicts=True,
+                unique_fields=["user", "post"],
+                update_fields=["like_type", "updated_at"],
+            )
+        if delete_ids:
+            _delete_likes(delete_ids)
+        for post_id, post_deltas in deltas.items():
+            bump_post_counters(post_id, **post_deltas)
+        if upserts or delete_ids:
+            bump_response_cache("likes")
+
+
+def _delete_likes(pks):
+    # A plain DELETE: QuerySet.delete() would send post_delete per row and
+    # adjust the counters a second time, on top of the batch deltas.
+    connection = connections[PostUserLikes.objects.db]
+    table = connection.ops.quote_name(PostUserLikes._meta.db_table)
+    column = connection.ops.quote_name(PostUserLikes._meta.pk.column)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {table} WHERE {column} IN ({', '.join(['%s'] * len(pks))})",
+            list(pks),
+        )
+
+
+# ---------- optional in-process flusher ----------
+_flusher = None
+_flusher_lock = threading.Lock()
+
+
+def _ensure_flusher_thread():
+    global _flusher
+    if not getattr(settings, "REACTION_FLUSH_THREAD", False):
+        return
+    if _flusher is not None and _flusher.is_alive():
+        return
+    with _flusher_lock:
+        if _flusher is None or not _flusher.is_alive():
+            _flusher = threading.Thread(target=_flush_forever, name="reaction-flusher", daemon=True)
+            _flusher.start()
+
+
+def _flush_forever():
+    interval = getattr(settings, "REACTION_FLUSH_INTERVAL_MS", 250) / 1000
+    while True:
+        time.sleep(interval)
+        try:
+            flush_reaction_buffer()
+        except Exception:
+            logger.exception("Reaction buffer flush failed; will retry.")
+        finally:
+            close_old_connections()
@@ -0,0 +1,129 @@
+from django.db import connections, transaction
+
+from api.cache import bump_response_cache
+from api.models import Post, PostUserLikes
+from api.reaction_buffer import buffer_reaction, write_behind_enabled
+
+# One round trip: optionally delete the viewer's reaction, otherwise upsert
+# it, apply the counter deltas to the post and return the resulting state.
+#
+# - `del` removes the row when clearing (type IS NULL) or when toggling off
+#   the reaction the viewer already has.
+# - `up` inserts, or flips the existing row; its ON CONFLICT ... WHERE makes
+#   it return a row only when something changed, and `inserted` tells a new
+#   row from a flip. With only two reaction types a flip always comes from
+#   the other one, so the deltas are exact even under concurrent clicks.
+REACTION_SQL = """
+WITH del AS (
+    DELETE FROM api_postuserlikes
+    WHERE user_id = %(user)s AND post_id = %(post)s
+      AND (%(type)s IS NULL OR (%(toggle)s AND like_type = %(type)s))
+    RETURNING like_type
+),
+up AS (
+    INSERT INTO api_postuserlikes (user_id, post_id, like_type, created_at, updated_at)
+    SELECT %(user)s, p.id, %(type)s, now(), now()
+    FROM api_post p
+    WHERE p.id = %(post)s AND %(type)s IS NOT NULL AND NOT EXISTS (SELECT 1 FROM del)
+    ON CONFLICT (user_id, post_id) DO UPDATE
+        SET like_type = EXCLUDED.like_type, updated_at = EXCLUDED.updated_at
+        WHERE api_postuserlikes.like_type <> EXCLUDED.like_type
+    RETURNING (xmax = 0) AS inserted
+),
+d AS (
+    SELECT
+        (SELECT count(*) FROM up WHERE %(type)s = 'like')
+          - (SELECT count(*) FROM del WHERE like_type = 'like')
+          - (SELECT count(*) FROM up WHERE NOT inserted AND %(type)s = 'dislike') AS likes,
+        (SELECT count(*) FROM up WHERE %(type)s = 'dislike')
+          - (SELECT count(*) FROM del WHERE like_type = 'dislike')
+          - (SELECT count(*) FROM up WHERE NOT inserted AND %(type)s = 'like') AS dislikes
+),
+bumped AS (
+    UPDATE api_post p SET
+        likes_count = GREATEST(p.likes_count + d.likes, 0),
+        dislikes_count = GREATEST(p.dislikes_count + d.dislikes, 0)
+    FROM d
+    WHERE p.id = %(post)s AND (d.likes <> 0 OR d.dislikes <> 0)
+    RETURNING p.likes_count, p.dislikes_count, p.comments_count
+)
+SELECT
+    b.likes_count, b.dislikes_count, b.comments_count,
+    CASE
+        WHEN EXISTS (SELECT 1 FROM up) THEN %(type)s
+        WHEN EXISTS (SELECT 1 FROM del) THEN NULL
+        ELSE (SELECT like_type FROM api_postuserlikes WHERE user_id = %(user)s AND post_id = %(post)s)
+    END AS reaction,
+    EXISTS (SELECT 1 FROM up) OR EXISTS (SELECT 1 FROM del) AS changed
+FROM (
+    SELECT likes_count, dislikes_count, comments_count FROM bumped
+    UNION ALL
+    SELECT likes_count, dislikes_count, comments_count FROM api_post
+    WHERE id = %(post)s AND NOT EXISTS (SELECT 1 FROM bumped)
+) b
+"""
+
+
+def set_reaction(profile, post_id, reaction, toggle=False, using="default"):
+    """
+    Set the viewer's reaction on a post to "like", "dislike" or None, or with
+    `toggle` clear it when it already equals `reaction`.
+
+    Returns {"post", "reaction", "likes_count", "dislikes_count",
+    "comments_count"}, or None if the post does not exist. In write-behind
+    mode the change is only buffered (see api.reaction_buffer).
+    """
+    if write_behind_enabled():
+        return buffer_reaction(profile, post_id, reaction, toggle=toggle)
+    if connections[using].vendor == "postgresql":
+        with connections[using].cursor() as cursor:
+            cursor.execute(REACTION_SQL, {
+                "user": profile.pk, "post": post_id, "type": reaction, "toggle": bool(toggle),
+            })
+            row = cursor.fetchone()
+        if row is None:
+            return None
+        likes, dislikes, comments, state, changed = row
+        if changed:
+            # Raw SQL skips the model signals that normally do this.
+            bump_response_cache("likes")
+    else:
+        result = _set_reaction_orm(profile, post_id, reaction, toggle, using)
+        if result is None:
+            return None
+        likes, dislikes, comments, state = result
+
+    return {
+        "post": post_id,
+        "reaction": state,
+        "likes_count": likes,
+        "dislikes_count": dislikes,
+        "comments_count": comments,
+    }
+
+
+def _set_reaction_orm(profile, post_id, reaction, toggle, using):
+    # Portable fallback (e.g. SQLite for local runs); counters follow via signals.
+    with transaction.atomic(using=using):
+        if not Post.objects.using(using).filter(pk=post_id).exists():
+            return None
+        like = (
+            PostUserLikes.objects.using(using).select_for_update()
+            .filter(user=profile, post_id=post_id).first()
+        )
+        if reaction is None or (toggle and like is not None and like.like_type == reaction):
+            if like is not None:
+                like.delete()
+            state = None
+        elif like is None:
+            PostUserLikes.objects.using(using).create(user=profile, post_id=post_id, like_type=reaction)
+            state = reaction
+        else:
+            if like.like_type != reaction:
+                like.like_type = reaction
+                like.save(update_fields=["like_type", "updated_at"])
+            state = reaction
+        counts = Post.objects.using(using).filter(pk=post_id).values_list(
+            "likes_count", "dislikes_count", "comments_count"
+        ).get()
+    return (*counts, state)
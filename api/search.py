@@ -0,0 +1,116 @@
+import re
+
+from django.contrib.postgres.aggregates import StringAgg
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connections
+from django.db.models import F, OuterRef, Subquery, TextField, Value
+from django.db.models.functions import Coalesce
+from rest_framework.filters import BaseFilterBackend
+
+from api.models import Post, UserProfile
+
+SEARCH_CONFIG = "english"
+
+# Relevance weights, highest first: title > tags > text > author.
+SEARCH_WEIGHTS = {"title": "A", "tags": "B", "text": "C", "author": "D"}
+# A last term that can be matched as a prefix: letters and digits only, so it
+# is safe inside to_tsquery().
+_PREFIX_TERM = re.compile(r"[^\W_]+")
+
+
+def is_postgres(using="default"):
+    return connections[using].vendor == "postgresql"
+
+
+def search_vector_expression():
+    """
+    Weighted tsvector for a Post row, usable in UPDATE: tags and author are
+    pulled in through correlated subqueries so no JOIN is needed.
+    """
+    tag_names = Subquery(
+        Post.tags.through.objects
+        .filter(post_id=OuterRef("pk"))
+        .values("post_id")
+        .annotate(names=StringAgg("tag__name", delimiter=" "))
+        .values("names")
+    )
+    author = Subquery(
+        UserProfile.objects.filter(pk=OuterRef("author_id")).order_by().values("user__username")[:1]
+    )
+    return (
+        SearchVector("title", weight=SEARCH_WEIGHTS["title"], config=SEARCH_CONFIG)
+        + SearchVector(
+            Coalesce(tag_names, Value(""), output_field=TextField()),
+            weight=SEARCH_WEIGHTS["tags"], config=SEARCH_CONFIG,
+        )
+        + SearchVector("text", weight=SEARCH_WEIGHTS["text"], config=SEARCH_CONFIG)
+        + SearchVector(
+            Coalesce(author, Value(""), output_field=TextField()),
+            weight=SEARCH_WEIGHTS["author"], config=SEARCH_CONFIG,
+        )
+    )
+
+
+def search_query(text):
+    """
+    tsquery for a search box that is still being typed: websearch syntax for
+    all but the last term, and the last (plain) term as a prefix, so "pyth"
+    already finds "python". Quoted, negated or OR terms stay as written.
+    """
+    *rest, last = text.split()
+    if not _PREFIX_TERM.fullmatch(last) or last.lower() == "or":
+        return SearchQuery(text, search_type="websearch", config=SEARCH_CONFIG)
+    prefix = SearchQuery(f"{last}:*", search_type="raw", config=SEARCH_CONFIG)
+    if not rest:
+        return prefix
+    return SearchQuery(" ".join(rest), search_type="websearch", config=SEARCH_CONFIG) & prefix
+
+
+def refresh_search_vectors(post_ids=None, using="default"):
+    """Recompute Post.search_vector for the given posts (all if None). No-op off PostgreSQL."""
+    if not is_postgres(using):
+        return 0
+    qs = Post.objects.using(using)
+    if post_ids is not None:
+        post_ids = list(post_ids)
+        if not post_ids:
+            return 0
+        qs = qs.filter(pk__in=post_ids)
+    return qs.update(search_vector=search_vector_expression())
+
+
+class PostSearchFilter(BaseFilterBackend):
+    """
+    Full-text post search via `?q=` (the legacy `?search=` is accepted too).
+
+    Matches the GIN-indexed `search_vector` with websearch syntax, the last
+    term as a prefix (see `search_query`), and orders by ts_rank unless the
+    client asked for an `?ordering=` other than the view's default one: the
+    frontend always sends that default, and it should not outrank relevance.
+    """
+    search_params = ("q", "search")
+    ordering_param = "ordering"
+
+    def get_search_text(self, request):
+        for param in self.search_params:
+            value = request.query_params.get(param, "").strip()
+            if value:
+                return value
+        return ""
+
+    def filter_queryset(self, request, queryset, view):
+        text = self.get_search_text(request)
+        if not text:
+            return queryset
+
+        query = search_query(text)
+        queryset = queryset.filter(search_vector=query).annotate(
+            rank=SearchRank(F("search_vector"), query)
+        )
+        if self.explicit_ordering(request, view):
+            return queryset
+        return queryset.order_by("-rank", "-id")
+
+    def explicit_ordering(self, request, view):
+        requested = [f.strip() for f in request.query_params.get(self.ordering_param, "").split(",") if f.strip()]
+        return bool(requested) and requested != list(getattr(view, "ordering", None) or [])
@@ -1,8 +1,15 @@
 from django.core.validators import RegexValidator
 from django.contrib.auth.models import User
+from django.db.models import Q
+from django.db.models.functions import Lower
 from rest_framework import serializers
 from rest_framework.serializers import ModelSerializer
-from api.models import Post, UserProfile, Tag, PostUserLikes, Comment
+from api.models import Post, UserProfile, Tag, PostUserLikes, Comment, LIKE_CHOICES
+from api.cache import bump_response_cache
+from api.fieldsets import SparseFieldsSerializerMixin
+from api.metrics import TimedListSerializer, TimedSerializerMixin
+from api.permissions import current_profile
+from api.tag_index import bump_tag_index_version
 
 
 class CurrentProfileDefault:
@@ -68,15 +75,71 @@ class UserSerializer(ModelSerializer):
 
 
 # ---------------- Tags ----------------
-class TagSerializer(ModelSerializer):
+class TagSerializer(TimedSerializerMixin, ModelSerializer):
     class Meta:
         model = Tag
         fields = ["id", "name"]
         read_only_fields = ["id"]
+        list_serializer_class = TimedListSerializer
+
+
+def resolve_tag_values(values):
+    """
+    Map each distinct tag input (an existing tag id, or a name matched
+    case-insensitively) to its Tag, creating missing names.
+
+    Costs one SELECT, plus one INSERT and one re-SELECT when new names are
+    involved, however many values are passed. Concurrent writers creating
+    the same name are absorbed by ON CONFLICT DO NOTHING on uniq_tag_name_ci.
+    """
+    raws = []
+    for v in values:
+        raw = str(v).strip()
+        if raw and raw not in raws:
+            raws.append(raw)
+    if not raws:
+        return {}
+
+    too_long = [r for r in raws if len(r) > Tag._meta.get_field("name").max_length and not r.isdigit()]
+    if too_long:
+        raise serializers.ValidationError({"tag_inputs": [f"Tag name too long: {too_long[0][:50]}"]})
+
+    ids = {int(r) for r in raws if r.isdigit()}
+    lowered = {r.lower() for r in raws}
+    found = list(
+        Tag.objects.annotate(lname=Lower("name"))
+        .filter(Q(pk__in=ids) | Q(lname__in=lowered))
+    )
+    by_id = {t.pk: t for t in found}
+    by_name = {t.lname: t for t in found}
+
+    result, missing = {}, {}
+    for raw in raws:
+        if raw.isdigit() and int(raw) in by_id:
+            result[raw] = by_id[int(raw)]
+        elif raw.lower() in by_name:
+            result[raw] = by_name[raw.lower()]
+        else:
+            missing.setdefault(raw.lower(), raw)
+
+    if missing:
+        Tag.objects.bulk_create([Tag(name=name) for name in missing.values()], ignore_conflicts=True)
+        # bulk_create skips post_save
+        bump_tag_index_version()
+        bump_response_cache("tags")
+        for t in Tag.objects.annotate(lname=Lower("name")).filter(lname__in=list(missing)):
+            by_name[t.lname] = t
+        for raw in raws:
+            if raw not in result and raw.lower() in by_name:
+                result[raw] = by_name[raw.lower()]
+    return result
 
 
 # ---------------- Posts ----------------
-class PostSerializer(ModelSerializer):
+LIKERS_LIMIT = 50
+
+
+class PostSerializer(SparseFieldsSerializerMixin, TimedSerializerMixin, ModelSerializer):
     author = serializers.HiddenField(default=CurrentProfileDefault())
     author_id = serializers.SerializerMethodField()
     author_username = serializers.SerializerMethodField()
@@ -89,7 +152,10 @@ class PostSerializer(ModelSerializer):
     )
 
     likes_count = serializers.IntegerField(read_only=True)
+    dislikes_count = serializers.IntegerField(read_only=True)
+    comments_count = serializers.IntegerField(read_only=True)
     liked_by_me = serializers.SerializerMethodField()
+    my_reaction = serializers.SerializerMethodField()
     likers = serializers.SerializerMethodField()  
 
     class Meta:
@@ -97,14 +163,24 @@ class PostSerializer(ModelSerializer):
         fields = [
             "id",
             "author", "author_id", "author_username",
-            "title", "text",
+            "title", "text", "excerpt", "word_count", "reading_time",
             "tags", "tag_inputs",
-            "likes_count", "liked_by_me", "likers",
+            "likes_count", "dislikes_count", "comments_count",
+            "liked_by_me", "my_reaction", "likers",
             "created_at", "updated_at",
         ]
-        read_only_fields = ["id", "tags", "likes_count", "liked_by_me", "likers", "created_at", "updated_at"]
+        read_only_fields = [
+            "id", "excerpt", "word_count", "reading_time",
+            "tags", "likes_count", "dislikes_count", "comments_count",
+            "liked_by_me", "my_reaction", "likers", "created_at", "updated_at",
+        ]
+        list_serializer_class = TimedListSerializer
 
     # ---------- getters ----------
+    def _viewer_profile(self):
+        request = self.context.get("request")
+        return current_profile(request.user) if request else None
+
     def get_author_username(self, obj):
         try:
             return obj.author.user.username
@@ -112,24 +188,33 @@ class PostSerializer(ModelSerializer):
             return None
         
     def get_author_id(self, obj):
-        return obj.author.id if getattr(obj, "author", None) else None
+        return obj.author_id
 
     def get_liked_by_me(self, obj):
-        request = self.context.get("request")
-        if not request or not getattr(request.user, "is_authenticated", False):
-            return False
-        user = request.user
-        profile = getattr(user, "profile", None) or getattr(user, "userprofile", None)
+        reactions = self.context.get("my_reactions")
+        if reactions is not None:
+            return obj.pk in reactions
+        profile = self._viewer_profile()
         if not profile:
             return False
         return PostUserLikes.objects.filter(post=obj, user=profile).exists()
 
-    def get_likers(self, obj):
-        request = self.context.get("request")
-        if not request or not getattr(request.user, "is_authenticated", False):
+    def get_my_reaction(self, obj):
+        reactions = self.context.get("my_reactions")
+        if reactions is not None:
+            return reactions.get(obj.pk)
+        profile = self._viewer_profile()
+        if not profile:
             return None
-        user = request.user
-        me = getattr(user, "profile", None) or getattr(user, "userprofile", None)
+        return (
+            PostUserLikes.objects
+            .filter(post=obj, user=profile)
+            .values_list("like_type", flat=True)
+            .first()
+        )
+
+    def get_likers(self, obj):
+        me = self._viewer_profile()
         if not me:
             return None
 
@@ -138,12 +223,14 @@ class PostSerializer(ModelSerializer):
         if not (is_owner or is_manager):
             return None
 
-        qs = (
-            PostUserLikes.objects
-            .filter(post=obj)
-            .select_related("user__user")
-            .order_by("-id")[:50]
-        )
+        qs = getattr(obj, "recent_likers", None)
+        if qs is None:
+            qs = (
+                PostUserLikes.objects
+                .filter(post=obj)
+                .select_related("user__user")
+                .order_by("-id")[:LIKERS_LIMIT]
+            )
         return [
             {
                 "id": l.user.id,
@@ -152,27 +239,22 @@ class PostSerializer(ModelSerializer):
             for l in qs
         ]
 
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        # Only present when the view prefetched it (?expand=comments_preview).
+        preview = getattr(instance, "preview_comments", None)
+        if preview is not None:
+            context = {**self.context, "sparse_fields": None}
+            data["comments_preview"] = CommentSerializer(preview, many=True, context=context).data
+        return data
+
     # ---------- helpers ----------
     def _resolve_tags(self, tag_inputs):
         if not tag_inputs:
             raise serializers.ValidationError({"tag_inputs": ["At least one category tag is required."]})
 
-        resolved = []
-        for v in tag_inputs:
-            raw = str(v).strip()
-            if not raw:
-                continue
-
-            if raw.isdigit():
-                t = Tag.objects.filter(id=int(raw)).first()
-                if t:
-                    resolved.append(t)
-                    continue
-
-            t = Tag.objects.filter(name__iexact=raw).first()
-            if not t:
-                t = Tag.objects.create(name=raw)
-            resolved.append(t)
+        by_raw = resolve_tag_values(tag_inputs)
+        resolved = list({t.pk: t for t in by_raw.values()}.values())
 
         if not resolved:
             raise serializers.ValidationError({"tag_inputs": ["At least one valid tag is required."]})
@@ -201,7 +283,7 @@ class PostSerializer(ModelSerializer):
 
 
 # ---------------- Comments ----------------
-class CommentSerializer(ModelSerializer):
+class CommentSerializer(SparseFieldsSerializerMixin, TimedSerializerMixin, ModelSerializer):
     author = serializers.HiddenField(default=CurrentProfileDefault())
     author_id = serializers.SerializerMethodField()
     author_username = serializers.SerializerMethodField() 
@@ -210,11 +292,16 @@ class CommentSerializer(ModelSerializer):
         model = Comment
         fields = ["id", "post", "author", "author_id", "author_username", "text", "reply_to", "created_at", "updated_at"]
         read_only_fields = ["id", "created_at", "updated_at"]
+        list_serializer_class = TimedListSerializer
 
     def get_author_id(self, obj):
-        return obj.author.id if getattr(obj, "author", None) else None
-    
+        return obj.author_id
+
     def get_author_username(self, obj):
+        # Annotated by the comment tree query; otherwise via select_related.
+        username = getattr(obj, "author_username", None)
+        if username is not None:
+            return username
         try:
             return obj.author.user.username
         except Exception:
@@ -226,8 +313,34 @@ class CommentSerializer(ModelSerializer):
         return attrs
 
 
+class CommentTreeSerializer(CommentSerializer):
+    """
+    A node of GET /api/posts/<id>/comments/tree/: the comment, its depth
+    below the requested level (1 = top), its loaded `replies`, the total
+    `replies_count` and a `more` link when replies were cut off by the
+    depth or sibling limit.
+    """
+    depth = serializers.IntegerField(source="tree_depth", read_only=True)
+    replies_count = serializers.IntegerField(read_only=True)
+    replies = serializers.SerializerMethodField()
+    more = serializers.SerializerMethodField()
+
+    class Meta(CommentSerializer.Meta):
+        fields = CommentSerializer.Meta.fields + ["depth", "replies_count", "replies", "more"]
+
+    def get_replies(self, obj):
+        return CommentTreeSerializer(obj.children, many=True, context=self.context).data
+
+    def get_more(self, obj):
+        loaded = len(obj.children)
+        if loaded >= obj.replies_count:
+            return None
+        after = obj.children[-1].pk if loaded else 0
+        return self.context["more_url"](obj.pk, after)
+
+
 # ---------------- Likes ----------------
-class PostUserLikesSerializer(ModelSerializer):
+class PostUserLikesSerializer(TimedSerializerMixin, ModelSerializer):
     user = serializers.HiddenField(default=CurrentProfileDefault())
     user_id = serializers.SerializerMethodField()
 
@@ -235,6 +348,13 @@ class PostUserLikesSerializer(ModelSerializer):
         model = PostUserLikes
         fields = ["id", "user", "user_id", "post", "like_type", "created_at", "updated_at"]
         read_only_fields = ["id", "created_at", "updated_at"]
+        list_serializer_class = TimedListSerializer
 
     def get_user_id(self, obj):
         return obj.user.id if getattr(obj, "user", None) else None
+
+
+class ReactionSerializer(serializers.Serializer):
+    """Input of PUT /api/posts/<id>/reaction/ (null clears the reaction)."""
+    reaction = serializers.ChoiceField(choices=LIKE_CHOICES, allow_null=True)
+    toggle = serializers.BooleanField(default=False)
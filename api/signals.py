@@ -1,7 +1,12 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, post_delete, pre_delete, m2m_changed
+from django.db.models import F
 from django.dispatch import receiver
 from django.contrib.auth import get_user_model
-from api.models import UserProfile
+from api.cache import bump_response_cache
+from api.counters import bump_post_counters, reaction_delta
+from api.models import UserProfile, Comment, Post, PostUserLikes, Tag
+from api.search import refresh_search_vectors
+from api.tag_index import bump_tag_index_version
 
 User = get_user_model()
 
@@ -9,3 +14,190 @@ User = get_user_model()
 def create_userprofile(sender, instance, created, **kwargs):
     if created:
         UserProfile.objects.get_or_create(user=instance)
+
+
+# ---------- Post counters ----------
+@receiver(post_save, sender=PostUserLikes)
+def count_like_saved(sender, instance, created, **kwargs):
+    if created:
+        bump_post_counters(instance.post_id, **reaction_delta(instance.like_type, 1))
+        return
+    old = getattr(instance, "_loaded_values", None) or {}
+    old_post, old_type = old.get("post_id"), old.get("like_type")
+    if old_post is None or (old_post, old_type) == (instance.post_id, instance.like_type):
+        return
+    if old_post == instance.post_id:
+        bump_post_counters(instance.post_id, **reaction_delta(old_type, -1), **reaction_delta(instance.like_type, 1))
+    else:
+        bump_post_counters(old_post, **reaction_delta(old_type, -1))
+        bump_post_counters(instance.post_id, **reaction_delta(instance.like_type, 1))
+
+
+@receiver(post_delete, sender=PostUserLikes)
+def count_like_deleted(sender, instance, **kwargs):
+    # Also fires for cascades (post, profile deletion) inside the collector's transaction.
+    bump_post_counters(instance.post_id, **reaction_delta(instance.like_type, -1))
+
+
+@receiver(post_save, sender=Comment)
+def count_comment_saved(sender, instance, created, **kwargs):
+    if created:
+        bump_post_counters(instance.post_id, comments_count=1)
+        return
+    old_post = (getattr(instance, "_loaded_values", None) or {}).get("post_id")
+    if old_post is not None and old_post != instance.post_id:
+        bump_post_counters(old_post, comments_count=-1)
+        bump_post_counters(instance.post_id, comments_count=1)
+
+
+@receiver(post_delete, sender=Comment)
+def count_comment_deleted(sender, instance, **kwargs):
+    bump_post_counters(instance.post_id, comments_count=-1)
+
+
+# ---------- Post search vector ----------
+SEARCHABLE_POST_FIELDS = {"title", "text", "author", "author_id"}
+
+
+@receiver(post_save, sender=Post)
+def index_post_saved(sender, instance, created, update_fields=None, **kwargs):
+    if created or update_fields is None or SEARCHABLE_POST_FIELDS & set(update_fields):
+        refresh_search_vectors([instance.pk])
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def index_post_tags_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in {"post_add", "post_remove", "post_clear", "pre_clear"}:
+        return
+    if not reverse:
+        if action != "pre_clear":
+            refresh_search_vectors([instance.pk])
+        return
+    # Reverse side (tag.posts.add/remove/clear): pk_set holds post ids,
+    # except for clear, where the affected posts must be captured beforehand.
+    if action == "pre_clear":
+        instance._cleared_post_ids = list(instance.posts.values_list("pk", flat=True))
+    elif action == "post_clear":
+        refresh_search_vectors(getattr(instance, "_cleared_post_ids", []))
+    else:
+        refresh_search_vectors(pk_set or [])
+
+
+@receiver(post_save, sender=Tag)
+def index_tag_renamed(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields is not None and "name" not in update_fields):
+        return
+    old = getattr(instance, "_loaded_values", None) or {}
+    if "name" in old and old["name"] == instance.name:
+        return
+    refresh_search_vectors(instance.posts.values_list("pk", flat=True))
+
+
+@receiver(pre_delete, sender=Tag)
+def remember_tag_posts(sender, instance, **kwargs):
+    instance._indexed_post_ids = list(instance.posts.values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=Tag)
+def index_tag_deleted(sender, instance, **kwargs):
+    refresh_search_vectors(getattr(instance, "_indexed_post_ids", []))
+
+
+@receiver(post_save, sender=User)
+def index_author_renamed(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields is not None and "username" not in update_fields):
+        return
+    refresh_search_vectors(Post.objects.filter(author__user=instance).values_list("pk", flat=True))
+
+
+# ---------- Tag usage counts / autocomplete index ----------
+def _bump_tag_usage(tag_ids, delta):
+    tag_ids = list(tag_ids)
+    if tag_ids and delta:
+        Tag.objects.filter(pk__in=tag_ids).update(usage_count=F("usage_count") + delta)
+
+
+@receiver(m2m_changed, sender=Post.tags.through)
+def count_tag_usage(sender, instance, action, reverse, model, pk_set, **kwargs):
+    through = Post.tags.through
+    owner = "tag_id" if reverse else "post_id"
+    other = "post_id" if reverse else "tag_id"
+
+    if action == "pre_remove":
+        # remove() may name rows that do not exist; count only the real ones.
+        instance._removed_tag_links = list(
+            through.objects.filter(**{owner: instance.pk, f"{other}__in": pk_set or []})
+            .values_list(other, flat=True)
+        )
+        return
+    if action == "pre_clear":
+        instance._removed_tag_links = list(
+            through.objects.filter(**{owner: instance.pk}).values_list(other, flat=True)
+        )
+        return
+
+    if action == "post_add":
+        # Django passes only the links actually inserted here.
+        changed, delta = list(pk_set or []), 1
+    elif action in {"post_remove", "post_clear"}:
+        changed, delta = getattr(instance, "_removed_tag_links", []), -1
+    else:
+        return
+
+    if reverse:
+        # instance is a Tag and `changed` are post ids.
+        if changed:
+            Tag.objects.filter(pk=instance.pk).update(usage_count=F("usage_count") + delta * len(changed))
+    else:
+        _bump_tag_usage(changed, delta)
+
+
+@receiver(pre_delete, sender=Post)
+def remember_post_tags(sender, instance, **kwargs):
+    # Through rows are removed by the delete collector without m2m_changed.
+    instance._deleted_tag_ids = list(instance.tags.values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=Post)
+def count_post_tags_deleted(sender, instance, **kwargs):
+    _bump_tag_usage(getattr(instance, "_deleted_tag_ids", []), -1)
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def invalidate_tag_index(sender, **kwargs):
+    bump_tag_index_version()
+
+
+# ---------- Response cache versions ----------
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_responses(sender, **kwargs):
+    bump_response_cache("posts")
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+@receiver(m2m_changed, sender=Post.tags.through)
+def invalidate_tag_responses(sender, action=None, **kwargs):
+    if action is None or action.startswith("post_"):
+        bump_response_cache("tags", "posts")
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_responses(sender, **kwargs):
+    bump_response_cache("comments")
+
+
+@receiver(post_save, sender=PostUserLikes)
+@receiver(post_delete, sender=PostUserLikes)
+def invalidate_like_responses(sender, **kwargs):
+    bump_response_cache("likes")
+
+
+@receiver(post_save, sender=User)
+def invalidate_author_responses(sender, created, update_fields=None, **kwargs):
+    # Author usernames are embedded in post and comment payloads.
+    if not created and (update_fields is None or "username" in update_fields):
+        bump_response_cache("posts", "comments")
@@ -0,0 +1,133 @@
+import threading
+import time
+from bisect import bisect_left
+from heapq import nsmallest
+
+from django.core.cache import cache
+from django.db.models.functions import Lower
+
+from api.models import Tag
+
+TAG_INDEX_VERSION_KEY = "tag_index:version"
+# Usage counts move with every tagged post; tolerate that much staleness in
+# the ranking instead of rebuilding on every post write. Tag creation,
+# renames and deletions invalidate immediately via the version key.
+TAG_INDEX_TTL = 60
+# Prefixes this short match many tags; their top results are precomputed.
+PRECOMPUTED_PREFIX_LEN = 2
+SUGGEST_LIMIT = 10
+
+
+class TagPrefixIndex:
+    """
+    Immutable in-memory prefix index over all tags.
+
+    Lower-cased names are kept sorted so a prefix maps to a contiguous range
+    found with two bisections; the top suggestions for every 1-2 character
+    prefix are precomputed because those ranges are the widest.
+    """
+
+    def __init__(self, rows, limit=SUGGEST_LIMIT):
+        # rows: iterable of (id, name, usage_count)
+        entries = sorted((name.lower(), name, tag_id, usage) for tag_id, name, usage in rows)
+        self.keys = [e[0] for e in entries]
+        self.entries = entries
+        self.limit = limit
+        self.top = {"": self._rank(entries)}
+        self._containing = {}
+        for entry in entries:
+            for n in range(1, PRECOMPUTED_PREFIX_LEN + 1):
+                if len(entry[0]) >= n:
+                    self.top.setdefault(entry[0][:n], [])
+        for prefix in list(self.top):
+            if prefix:
+                self.top[prefix] = self._rank(self._range(prefix))
+
+    def _rank(self, entries, limit=None):
+        # Most used first, then alphabetical.
+        return nsmallest(limit or self.limit, entries, key=lambda e: (-e[3], e[1]))
+
+    def _range(self, prefix):
+        lo = bisect_left(self.keys, prefix)
+        hi = bisect_left(self.keys, prefix + "\uffff", lo)
+        return self.entries[lo:hi]
+
+    def suggest(self, q, limit=None):
+        limit = limit or self.limit
+        prefix = q.strip().lower()
+        if prefix in self.top and limit <= self.limit:
+            hits = self.top[prefix][:limit]
+        elif len(prefix) <= PRECOMPUTED_PREFIX_LEN and limit <= self.limit:
+            hits = []  # no tag starts with this prefix
+        else:
+            hits = self._rank(self._range(prefix), limit)
+        return [self._row(e) for e in hits]
+
+    def containing(self, q, limit=None):
+        """
+        Top tags whose name contains `q` anywhere, by a scan of the index: for
+        1-2 character queries, which the trigram index cannot serve. Results
+        are memoized for the life of this (immutable) index.
+        """
+        limit = limit or self.limit
+        needle = q.strip().lower()
+        key = (needle, limit)
+        if key not in self._containing:
+            self._containing[key] = self._rank([e for e in self.entries if needle in e[0]], limit)
+        return [self._row(e) for e in self._containing[key]]
+
+    @staticmethod
+    def _row(entry):
+        return {"id": entry[2], "name": entry[1], "count": entry[3]}
+
+
+_lock = threading.Lock()
+_state = {"index": None, "version": None, "built_at": 0.0}
+
+
+def bump_tag_index_version():
+    """Invalidate every worker's in-process tag index."""
+    try:
+        cache.incr(TAG_INDEX_VERSION_KEY)
+    except ValueError:
+        cache.set(TAG_INDEX_VERSION_KEY, 1, timeout=None)
+
+
+def get_tag_index():
+    """Return this worker's TagPrefixIndex, rebuilding it if stale."""
+    version = cache.get(TAG_INDEX_VERSION_KEY, 0)
+    now = time.monotonic()
+    index = _state["index"]
+    if index is not None and _state["version"] == version and now - _state["built_at"] < TAG_INDEX_TTL:
+        return index
+    with _lock:
+        if _state["index"] is index:
+            rows = Tag.objects.order_by().values_list("id", "name", "usage_count")
+            _state.update(index=TagPrefixIndex(rows), version=version, built_at=now)
+        return _state["index"]
+
+
+def suggest_tags(q, limit=SUGGEST_LIMIT):
+    """
+    Top tags by usage for an autocomplete query: prefix matches from the
+    in-process index first, then substring matches, from the trigram index
+    on LOWER(name) for 3+ characters and from a scan of the in-process index
+    for shorter queries.
+    """
+    q = q.strip()
+    index = get_tag_index()
+    results = index.suggest(q, limit)
+    if len(results) >= limit or not q:
+        return results
+    seen = {r["id"] for r in results}
+    if len(q) < 3:
+        extra = [r for r in index.containing(q, limit + len(seen)) if r["id"] not in seen]
+        return results + extra[: limit - len(results)]
+    extra = (
+        Tag.objects.annotate(lname=Lower("name"))
+        .filter(lname__contains=q.lower())
+        .exclude(pk__in=seen)
+        .order_by("-usage_count", "name")
+        .values_list("id", "name", "usage_count")[: limit - len(results)]
+    )
+    return results + [{"id": i, "name": n, "count": c} for i, n, c in extra]
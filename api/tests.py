@@ -0,0 +1,600 @@
+import csv
+import io
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection, connections
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.pagination import PageNumberPagination
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework.throttling import SimpleRateThrottle
+from rest_framework.views import APIView
+
+from api import reaction_buffer, tag_index
+from api.bench import AUTH_ONLY, ROLES, SCENARIO_NAMES, compare, run_benchmarks
+from api.cache import AnonymousResponseCacheMixin
+from api.export import export_lines, parse_bound
+from api.models import Comment, Post, PostUserLikes, Tag
+from api.reactions import set_reaction
+from api.tag_index import suggest_tags
+from api.throttles import ScopedSlidingWindowThrottle, SlidingWindowThrottle
+
+
+def make_user(username, role="user"):
+    user = User.objects.create(username=username)
+    if role != "user":
+        user.profile.role = role
+        user.profile.save(update_fields=["role"])
+    return user
+
+
+def make_posts(author, count, tags, likers, prefix):
+    """`count` posts by `author`, each tagged and liked by every liker (every other one disliked)."""
+    posts = []
+    for i in range(count):
+        post = Post.objects.create(author=author.profile, title=f"{prefix} {i}", text=f"Body of {prefix} {i}.")
+        post.tags.set(tags)
+        for n, liker in enumerate(likers):
+            PostUserLikes.objects.create(
+                user=liker.profile, post=post, like_type="dislike" if (i + n) % 2 else "like",
+            )
+        posts.append(post)
+    return posts
+
+
+class PostQueryBudgetTests(TestCase):
+    """
+    The number of queries behind the post read endpoints must not depend on
+    how many posts (or likers) a response carries: per-viewer state, tags and
+    likers are resolved once per page.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.viewer = make_user("viewer", role="manager")
+        cls.small_author = make_user("small-author", role="manager")
+        cls.big_author = make_user("big-author", role="manager")
+        likers = [make_user(f"liker-{n}") for n in range(50)]
+        tags = [Tag.objects.create(name=f"tag-{n}") for n in range(3)]
+
+        make_posts(cls.small_author, 4, tags, [cls.viewer, *likers[:2]], "Small")
+        make_posts(cls.big_author, 49, tags, [cls.viewer, *likers[:2]], "Big")
+        cls.few_likers = make_posts(cls.small_author, 1, tags[:1], likers[:5], "Few likers")[0]
+        cls.many_likers = make_posts(cls.big_author, 1, tags, likers, "Many likers")[0]
+
+    def get(self, user, path, budget=None):
+        """
+        (query count, response) for one GET as `user`, loaded fresh so nothing
+        is cached on it. With `budget`, asserts the request runs exactly that many.
+        """
+        client = APIClient()
+        client.force_authenticate(User.objects.get(pk=user.pk))
+        with CaptureQueriesContext(connection) as queries:
+            if budget is None:
+                response = client.get(path)
+            else:
+                with self.assertNumQueries(budget):
+                    response = client.get(path)
+        self.assertEqual(response.status_code, 200, response.content)
+        return len(queries.captured_queries), response
+
+    def list_page(self, page_size, budget=None):
+        with mock.patch.object(PageNumberPagination, "page_size", page_size):
+            queries, response = self.get(self.viewer, "/api/posts/", budget)
+        self.assertEqual(len(response.data["results"]), page_size)
+        return queries, response
+
+    def test_list_budget_is_constant_across_page_sizes(self):
+        budget, _ = self.list_page(5)
+        self.list_page(50, budget)
+
+    @override_settings(FAST_LIST_SERIALIZATION=False)
+    def test_serializer_list_budget_is_constant_across_page_sizes(self):
+        budget, _ = self.list_page(5)
+        self.list_page(50, budget)
+
+    def test_retrieve_budget_does_not_grow_with_likers(self):
+        budget, small = self.get(self.viewer, f"/api/posts/{self.few_likers.pk}/")
+        _, big = self.get(self.viewer, f"/api/posts/{self.many_likers.pk}/", budget)
+        self.assertEqual(len(small.data["likers"]), 5)
+        self.assertEqual(len(big.data["likers"]), 50)
+
+    def test_mine_budget_is_constant_across_post_counts(self):
+        budget, small = self.get(self.small_author, "/api/posts/mine/")
+        _, big = self.get(self.big_author, "/api/posts/mine/", budget)
+        self.assertEqual(len(small.data), 5)
+        self.assertEqual(len(big.data), 50)
+
+    def test_viewer_reactions_are_reported(self):
+        _, response = self.list_page(50)
+        for post in response.data["results"]:
+            reacted = post["title"].startswith(("Small", "Big"))
+            self.assertEqual(post["liked_by_me"], reacted, post["title"])
+            if reacted:
+                self.assertIn(post["my_reaction"], ("like", "dislike"))
+            else:
+                self.assertIsNone(post["my_reaction"])
+
+
+class BurstView(APIView):
+    authentication_classes = []
+    permission_classes = [AllowAny]
+    throttle_classes = [ScopedSlidingWindowThrottle]
+    throttle_scope = "burst_test"
+
+    def get(self, request):
+        return Response({"ok": True})
+
+
+class SlidingWindowThrottleTests(SimpleTestCase):
+    """
+    Many concurrent requests from one client (one cache key): exactly the
+    limit gets through, and every 429 carries Retry-After.
+    """
+    LIMIT = 5
+    # Halfway through an hour-long window, so the test never straddles two.
+    NOW = 1_000_000 * 3600 + 1800.0
+
+    def setUp(self):
+        patches = [
+            mock.patch.dict(SimpleRateThrottle.THROTTLE_RATES, {"burst_test": f"{self.LIMIT}/hour"}),
+            mock.patch.object(SlidingWindowThrottle, "timer", staticmethod(lambda: self.NOW)),
+        ]
+        for patch in patches:
+            patch.start()
+            self.addCleanup(patch.stop)
+        window = int(self.NOW // 3600)
+        keys = [f"throttle:burst_test:ip-127.0.0.1:{w}" for w in (window - 1, window)]
+        cache.delete_many(keys)
+        self.addCleanup(cache.delete_many, keys)
+        self.view = BurstView.as_view()
+        self.factory = APIRequestFactory()
+
+    def call(self):
+        return self.view(self.factory.get("/burst/", REMOTE_ADDR="127.0.0.1"))
+
+    def test_concurrent_burst_never_exceeds_the_limit(self):
+        requests = 40
+        start = threading.Barrier(requests)
+
+        def hit(_):
+            start.wait()
+            return self.call()
+
+        with ThreadPoolExecutor(max_workers=requests) as pool:
+            responses = list(pool.map(hit, range(requests)))
+
+        admitted = [r for r in responses if r.status_code == 200]
+        rejected = [r for r in responses if r.status_code == 429]
+        self.assertEqual(len(admitted), self.LIMIT)
+        self.assertEqual(len(rejected), requests - self.LIMIT)
+        for response in rejected:
+            self.assertGreaterEqual(int(response["Retry-After"]), 1)
+        self.assertEqual(self.call().status_code, 429)
+
+    def test_sequential_requests_get_exactly_the_limit(self):
+        statuses = [self.call().status_code for _ in range(self.LIMIT + 2)]
+        self.assertEqual(statuses, [200] * self.LIMIT + [429, 429])
+        response = self.call()
+        # Over the limit in the current window: wait for it to close.
+        self.assertGreaterEqual(int(response["Retry-After"]), 1800)
+
+
+class FastListParityTests(TestCase):
+    """
+    The values-based list path (FastListMixin) must render exactly what the
+    regular serializers render, for every kind of viewer.
+    """
+    PATHS = [
+        "/api/posts/",
+        "/api/posts/?fields=id,title,text,tags,liked_by_me,my_reaction,likers",
+        "/api/comments/",
+        "/api/comments/?fields=id,post,author_username",
+        "/api/tags/",
+    ]
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = make_user("owner")
+        cls.manager = make_user("manager", role="manager")
+        cls.other = make_user("other")
+        tags = [Tag.objects.create(name=name) for name in ("python", "Django", "ops")]
+        posts = make_posts(cls.owner, 3, tags[:2], [cls.manager, cls.other], "Owned")
+        posts += make_posts(cls.other, 3, tags[1:], [cls.owner], "Other")
+        posts[0].text = "A longer body, " * 30
+        posts[0].save()
+        for n, post in enumerate(posts):
+            parent = Comment.objects.create(post=post, author=cls.owner.profile, text=f"First comment {n}")
+            Comment.objects.create(post=post, author=cls.manager.profile, text=f"A reply {n}", reply_to=parent)
+
+    def render(self, user, path, fast):
+        client = APIClient()
+        if user is not None:
+            client.force_authenticate(User.objects.get(pk=user.pk))
+        with override_settings(FAST_LIST_SERIALIZATION=fast):
+            response = client.get(path)
+        self.assertEqual(response.status_code, 200, response.content)
+        return json.loads(response.content)
+
+    def test_fast_path_matches_serializers(self):
+        # Anonymous responses are cached across both runs otherwise.
+        with mock.patch.object(AnonymousResponseCacheMixin, "_response_is_cacheable", return_value=False):
+            for user in (None, self.owner, self.manager):
+                for path in self.PATHS:
+                    with self.subTest(viewer=getattr(user, "username", "anonymous"), path=path):
+                        expected = self.render(user, path, fast=False)
+                        self.assertTrue(expected["results"])
+                        self.assertEqual(self.render(user, path, fast=True), expected)
+
+
+class PostSearchTests(TestCase):
+    """The live search box sends what has been typed so far: the last word is a prefix."""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = make_user("writer")
+        tag = Tag.objects.create(name="languages")
+        make_posts(author, 1, [tag], [], "Python packaging tips")
+        make_posts(author, 1, [tag], [], "Gardening for beginners")
+        # Newer, and only mentions "beginners" in the body.
+        Post.objects.create(author=author.profile, title="Cooking notes", text="Advice for beginners.")
+
+    def titles(self, query, **params):
+        response = APIClient().get("/api/posts/", {"q": query, **params})
+        self.assertEqual(response.status_code, 200, response.content)
+        return [post["title"] for post in response.data["results"]]
+
+    def test_partial_last_word_matches(self):
+        self.assertEqual(self.titles("pyth"), ["Python packaging tips 0"])
+        self.assertEqual(self.titles("python pack"), ["Python packaging tips 0"])
+
+    def test_earlier_words_must_still_match(self):
+        self.assertEqual(self.titles("gardening pyth"), [])
+
+    def test_quoted_and_negated_terms_keep_websearch_meaning(self):
+        self.assertEqual(self.titles('"python packaging"'), ["Python packaging tips 0"])
+        self.assertEqual(self.titles("tips -gardening"), ["Python packaging tips 0"])
+
+    def test_relevance_wins_over_the_default_ordering(self):
+        # The frontend always sends its default sort along with the query.
+        expected = ["Gardening for beginners 0", "Cooking notes"]
+        self.assertEqual(self.titles("beginners"), expected)
+        self.assertEqual(self.titles("beginners", ordering="-created_at"), expected)
+        self.assertEqual(self.titles("beginners", ordering="title"), ["Cooking notes", "Gardening for beginners 0"])
+
+
+class ConditionalGetTests(TestCase):
+    """A revalidation is answered from the cached resource versions, without touching the database."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = make_user("author")
+        cls.post = make_posts(cls.author, 2, [], [], "Cached")[0]
+
+    def revalidate(self, path, etag, queries):
+        with self.assertNumQueries(queries):
+            return APIClient().get(path, HTTP_IF_NONE_MATCH=etag)
+
+    def test_anonymous_revalidation_runs_no_queries(self):
+        for path in ("/api/posts/", "/api/posts/?cursor=", f"/api/posts/{self.post.pk}/", "/api/comments/"):
+            with self.subTest(path=path):
+                etag = APIClient().get(path)["ETag"]
+                self.assertEqual(self.revalidate(path, etag, 0).status_code, 304)
+
+    def test_committed_write_changes_the_etag(self):
+        etag = APIClient().get("/api/posts/")["ETag"]
+        with self.captureOnCommitCallbacks(execute=True):
+            Post.objects.filter(pk=self.post.pk).first().save()
+        response = APIClient().get("/api/posts/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+
+@override_settings(REACTION_WRITE_BEHIND=True, REACTION_FLUSH_THREAD=False)
+class ReactionBufferFlushTests(TestCase):
+    """Buffered reactions reach the database exactly once, whatever happens to the flusher."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = make_user("author")
+        cls.readers = [make_user(f"reader-{n}") for n in range(3)]
+        cls.post = make_posts(cls.author, 1, [], [], "Buffered")[0]
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def react(self, reader, reaction="like"):
+        result = reaction_buffer.buffer_reaction(reader.profile, self.post.pk, reaction)
+        self.assertTrue(result["changed"])
+
+    def assertStored(self, likes, dislikes=0):
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.likes_count, self.post.dislikes_count), (likes, dislikes))
+        self.assertEqual(PostUserLikes.objects.filter(post=self.post, like_type="like").count(), likes)
+        self.assertEqual(PostUserLikes.objects.filter(post=self.post, like_type="dislike").count(), dislikes)
+
+    def test_failed_flush_is_replayed(self):
+        self.react(self.readers[0])
+        self.react(self.readers[1], "dislike")
+        with mock.patch.object(reaction_buffer, "apply_reaction_states", side_effect=RuntimeError("db down")):
+            with self.assertRaises(RuntimeError):
+                reaction_buffer.flush_reaction_buffer()
+        self.assertEqual(cache.get(reaction_buffer.CURSOR_KEY, 0), 0)
+        self.assertIsNone(cache.get(reaction_buffer.LOCK_KEY))
+        self.assertStored(0)
+
+        self.assertEqual(reaction_buffer.flush_reaction_buffer(), 2)
+        self.assertEqual(reaction_buffer.flush_reaction_buffer(), 0)
+        self.assertStored(1, 1)
+
+    def test_missing_event_waits_for_the_gap_grace(self):
+        self.react(self.readers[0])
+        reaction_buffer._next_event_id()  # handed out, never stored: a request that died
+        self.react(self.readers[1])
+
+        self.assertEqual(reaction_buffer.flush_reaction_buffer(), 1)
+        self.assertStored(1)
+        later = time.time() + reaction_buffer.GAP_GRACE + 1
+        with mock.patch.object(reaction_buffer.time, "time", return_value=later):
+            self.assertEqual(reaction_buffer.flush_reaction_buffer(), 2)
+        self.assertStored(2)
+
+    def test_flush_skipped_while_another_holds_the_lock(self):
+        self.react(self.readers[0])
+        cache.add(reaction_buffer.LOCK_KEY, "another-flusher")
+        self.assertEqual(reaction_buffer.flush_reaction_buffer(), 0)
+        self.assertEqual(cache.get(reaction_buffer.LOCK_KEY), "another-flusher")
+        self.assertStored(0)
+
+    def test_flusher_that_lost_its_lock_stops_and_leaves_it(self):
+        for reader in self.readers:
+            self.react(reader)
+        apply = reaction_buffer.apply_reaction_states
+
+        def stalled(states):
+            # The lock expired while this flusher was busy and someone took it.
+            cache.set(reaction_buffer.LOCK_KEY, "new-owner")
+            apply(states)
+
+        with mock.patch.object(reaction_buffer, "apply_reaction_states", side_effect=stalled):
+            self.assertEqual(reaction_buffer.flush_reaction_buffer(batch_size=1), 1)
+        self.assertEqual(cache.get(reaction_buffer.LOCK_KEY), "new-owner")
+        self.assertEqual(cache.get(reaction_buffer.CURSOR_KEY), 1)
+        self.assertStored(1)
+
+    def test_batch_applied_by_another_flusher_is_not_reapplied(self):
+        self.react(self.readers[0])
+        self.react(self.readers[0], "dislike")
+        apply_lock, apply = reaction_buffer._apply_lock, reaction_buffer.apply_reaction_states
+
+        @contextmanager
+        def overtaken():
+            with apply_lock():
+                # A second flusher applied both events while this one waited.
+                apply({(self.readers[0].profile.pk, self.post.pk): "dislike"})
+                cache.set(reaction_buffer.CURSOR_KEY, 2, timeout=None)
+                yield
+
+        with mock.patch.object(reaction_buffer, "_apply_lock", overtaken), \
+                mock.patch.object(reaction_buffer, "apply_reaction_states") as stale_apply:
+            self.assertEqual(reaction_buffer.flush_reaction_buffer(), 0)
+        stale_apply.assert_not_called()
+        self.assertEqual(cache.get(reaction_buffer.CURSOR_KEY), 2)
+        self.assertStored(0, 1)
+
+    def test_overlay_keeps_the_latest_click(self):
+        profile_id = self.readers[0].profile.pk
+        reaction_buffer._set_pending(profile_id, self.post.pk, "dislike", 7)
+        # The earlier click's write arrives last.
+        reaction_buffer._set_pending(profile_id, self.post.pk, "like", 6)
+        self.assertEqual(reaction_buffer.pending_reactions(profile_id, [self.post.pk]), {self.post.pk: "dislike"})
+
+    def test_legacy_like_keeps_the_serializer_shape(self):
+        client = APIClient()
+        client.force_authenticate(User.objects.get(pk=self.readers[0].pk))
+        created = client.post("/api/post-user-likes/", {"post": self.post.pk}, format="json")
+        self.assertEqual(created.status_code, 201, created.content)
+        self.assertEqual(set(created.data), {"id", "user_id", "post", "like_type", "created_at", "updated_at"})
+        self.assertEqual((created.data["post"], created.data["like_type"], created.data["id"]), (self.post.pk, "like", None))
+
+        reaction_buffer.flush_reaction_buffer()
+        again = client.post("/api/post-user-likes/", {"post": self.post.pk}, format="json")
+        self.assertEqual(again.status_code, 200, again.content)
+        self.assertEqual(set(again.data), set(created.data))
+        self.assertEqual(again.data["id"], PostUserLikes.objects.get(post=self.post).pk)
+
+
+class ReactionEndpointTests(TestCase):
+    """PUT /api/posts/<id>/reaction/ moves between states and keeps the post counters exact."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = make_user("author")
+        cls.reader = make_user("reader")
+        cls.post = make_posts(cls.author, 1, [], [], "Reacted")[0]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.reader)
+
+    def put(self, reaction, toggle=False, post_id=None):
+        return self.client.put(
+            f"/api/posts/{post_id or self.post.pk}/reaction/",
+            {"reaction": reaction, "toggle": toggle}, format="json",
+        )
+
+    def assertState(self, response, reaction, likes, dislikes):
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(
+            (response.data["reaction"], response.data["likes_count"], response.data["dislikes_count"]),
+            (reaction, likes, dislikes),
+        )
+        self.post.refresh_from_db()
+        self.assertEqual((self.post.likes_count, self.post.dislikes_count), (likes, dislikes))
+        stored = PostUserLikes.objects.filter(post=self.post, user=self.reader.profile).values_list("like_type", flat=True)
+        self.assertEqual(list(stored), [reaction] if reaction else [])
+
+    def check_transitions(self):
+        self.assertState(self.put("like"), "like", 1, 0)
+        self.assertState(self.put("like"), "like", 1, 0)
+        self.assertState(self.put("dislike"), "dislike", 0, 1)
+        self.assertState(self.put("dislike", toggle=True), None, 0, 0)
+        self.assertState(self.put("like", toggle=True), "like", 1, 0)
+        self.assertState(self.put(None), None, 0, 0)
+        self.assertState(self.put(None), None, 0, 0)
+
+    def test_transitions(self):
+        self.check_transitions()
+
+    def test_transitions_without_postgres(self):
+        # The portable ORM path, used off Postgres.
+        with mock.patch.object(connections["default"], "vendor", "sqlite"):
+            self.check_transitions()
+
+    def test_missing_post(self):
+        self.assertEqual(self.put("like", post_id=self.post.pk + 1000).status_code, 404)
+        self.assertFalse(PostUserLikes.objects.exists())
+
+
+class ConcurrentReactionTests(TransactionTestCase):
+    """Clicks racing on one post leave counters equal to the real number of rows."""
+
+    def test_counters_match_rows_under_concurrent_clicks(self):
+        author = make_user("author")
+        readers = [make_user(f"reader-{n}") for n in range(4)]
+        post = make_posts(author, 1, [], [], "Contended")[0]
+        clicks = [("like", False), ("dislike", False), ("like", True), ("dislike", True), ("like", False), (None, False)]
+        # Two threads per reader: racing double clicks as well as racing readers.
+        threads = len(readers) * 2
+        start = threading.Barrier(threads)
+
+        def click(n):
+            try:
+                profile = readers[n % len(readers)].profile
+                start.wait()
+                for i in range(len(clicks) * 2):
+                    reaction, toggle = clicks[(i + n) % len(clicks)]
+                    set_reaction(profile, post.pk, reaction, toggle=toggle)
+            finally:
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(click, range(threads)))
+
+        post.refresh_from_db()
+        rows = PostUserLikes.objects.filter(post=post)
+        self.assertEqual(post.likes_count, rows.filter(like_type="like").count())
+        self.assertEqual(post.dislikes_count, rows.filter(like_type="dislike").count())
+
+
+class TagSuggestTests(TestCase):
+    """Tag autocomplete: prefix matches first, then tags containing the query, even when it is short."""
+
+    @classmethod
+    def setUpTestData(cls):
+        author = make_user("tagger")
+        tags = {name: Tag.objects.create(name=name) for name in ("python", "happy", "rust", "spy")}
+        make_posts(author, 2, [tags["happy"]], [], "Tagged")
+
+    def setUp(self):
+        # Each worker keeps its index for a while; start from this test's tags.
+        patch = mock.patch.dict(tag_index._state, {"index": None})
+        patch.start()
+        self.addCleanup(patch.stop)
+
+    def names(self, q):
+        return [tag["name"] for tag in suggest_tags(q)]
+
+    def test_short_query_includes_substring_matches(self):
+        self.assertEqual(self.names("py"), ["python", "happy", "spy"])
+        self.assertEqual(self.names("s"), ["spy", "rust"])
+
+    def test_longer_query_includes_substring_matches(self):
+        self.assertEqual(self.names("ust"), ["rust"])
+
+
+class ExportFormatTests(TestCase):
+    """NDJSON and CSV exports carry identical values, timestamps included."""
+
+    @classmethod
+    def setUpTestData(cls):
+        make_posts(make_user("exporter"), 2, [Tag.objects.create(name="data")], [], "Exported")
+
+    def test_timestamps_match_across_formats(self):
+        parsed = [json.loads(line) for line in export_lines("posts", "ndjson")]
+        reader = csv.DictReader(io.StringIO("".join(export_lines("posts", "csv"))))
+        for as_json, as_csv in zip(parsed, reader, strict=True):
+            for column in ("created_at", "updated_at"):
+                self.assertEqual(as_csv[column], as_json[column])
+                self.assertEqual(parse_bound(as_json[column]), Post.objects.values_list(column, flat=True).get(pk=as_json["id"]))
+
+
+class BenchHarnessTests(TestCase):
+    """
+    `manage.py bench_api` smoke run on a tiny dataset: every scenario answers,
+    and no endpoint needs more queries once there is more data.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        make_user("demo")
+        make_user("admin", role="manager")
+        cls.author = make_user("bench-author")
+        cls.tags = [Tag.objects.create(name=name) for name in ("django", "python")]
+        cls.likers = [make_user(f"bench-liker-{n}") for n in range(6)]
+        post = make_posts(cls.author, 3, cls.tags, cls.likers[:2], "Benchmark")[0]
+        parent = Comment.objects.create(post=post, author=cls.author.profile, text="First")
+        Comment.objects.create(post=post, author=cls.likers[0].profile, text="Reply", reply_to=parent)
+
+    def setUp(self):
+        # Anonymous responses must not come from other tests' cache entries.
+        cache.clear()
+        self.addCleanup(cache.clear)
+
+    def run_harness(self):
+        return run_benchmarks(iterations=2, warmup=1)
+
+    def test_every_scenario_answers(self):
+        results = self.run_harness()
+        self.assertEqual(set(results), set(SCENARIO_NAMES) - {"login"})
+        for name, by_role in results.items():
+            expected_roles = set(ROLES) - ({"anonymous"} if name in AUTH_ONLY else set())
+            self.assertEqual(set(by_role), expected_roles, name)
+            for role, summary in by_role.items():
+                self.assertEqual(summary["n"], 2)
+                self.assertTrue(all(status < 400 for status in summary["statuses"]), (name, role, summary))
+
+    def test_query_counts_do_not_grow_with_the_data(self):
+        baseline = self.run_harness()
+        make_posts(self.author, 20, self.tags, self.likers, "More")
+        self.assertEqual(compare(self.run_harness(), baseline, metric="queries", tolerance=0), [])
+
+
+class BenchCompareTests(SimpleTestCase):
+    BASELINE = {"post_list": {"regular": {"p95_ms": 10.0, "queries": 4}}}
+
+    def result(self, p95_ms, queries):
+        return {"post_list": {"regular": {"p95_ms": p95_ms, "queries": queries}}}
+
+    def test_within_tolerance(self):
+        self.assertEqual(compare(self.result(11.9, 4), self.BASELINE, tolerance=0.2), [])
+
+    def test_slower_and_more_queries_are_reported(self):
+        regressions = compare(self.result(15.0, 5), self.BASELINE, tolerance=0.2)
+        self.assertEqual(regressions, [
+            "post_list [regular]: p95_ms 10.0 -> 15.0 (+50%)",
+            "post_list [regular]: queries 4 -> 5",
+        ])
+
+    def test_unknown_entries_are_ignored(self):
+        self.assertEqual(compare({"tag_suggest": {"anonymous": {"p95_ms": 1, "queries": 9}}}, self.BASELINE), [])
@@ -1,16 +1,173 @@
-from rest_framework import throttling
+import threading
+
+from django.core.cache import cache as default_cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.redis import RedisCache
 from rest_framework.throttling import SimpleRateThrottle
-from django.core.cache import cache as django_cache
 
 
-class MyRateThrottle(throttling.BaseThrottle):
+# Check and count in one step on Redis: increment the current window only if
+# the request fits. KEYS: current, previous window. ARGV: weight of the
+# previous window, limit, expiry. Returns {allowed, current, previous}.
+SLIDING_WINDOW_LUA = """
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+if previous * tonumber(ARGV[1]) + current + 1 > tonumber(ARGV[2]) then
+    return {0, current, previous}
+end
+current = redis.call('INCR', KEYS[1])
+if current == 1 then
+    redis.call('EXPIRE', KEYS[1], ARGV[3])
+end
+return {1, current, previous}
+"""
+
+# Local memory is private to the process, so a process lock makes it atomic.
+_local_lock = threading.Lock()
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """
+    Sliding-window-counter rate limit.
+
+    The allowance over the last `duration` seconds is estimated as
+    `previous_window * (1 - elapsed_fraction) + current_window`. The check
+    and the increment of the current window's counter are one atomic step:
+    a Lua script (one round trip) on Redis, a process lock on local memory.
+    Only admitted requests are counted, so exactly `num_requests` get through
+    however many arrive at once. Other backends fall back to INCR, then
+    DECR when rejected; there a few requests that would have fit can be
+    turned away during a burst (with a one-second Retry-After).
+
+    Subclasses define `scope` and `get_cache_key()`; DRF turns `wait()` into
+    the `Retry-After` header of the 429 response.
+    """
+    cache = default_cache
+    cache_format = "throttle:%(scope)s:%(ident)s"
+    # Shortest wait reported to a rejected caller, in seconds.
+    min_wait = 1.0
+
     def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        window = int(self.now // self.duration)
+        self.elapsed = (self.now % self.duration) / self.duration
+        args = (f"{self.key}:{window}", f"{self.key}:{window - 1}", 1 - self.elapsed)
+        if isinstance(self.cache, RedisCache):
+            allowed, self.current, self.previous = self._check_and_incr_redis(*args)
+        elif isinstance(self.cache, LocMemCache):
+            allowed, self.current, self.previous = self._check_and_incr_local(*args)
+        else:
+            allowed, self.current, self.previous = self._incr_then_check(*args)
+        return bool(allowed)
+
+    @property
+    def _expiry(self):
+        # The counter is still read as the previous window for one more window.
+        return self.duration * 2 + 1
+
+    def _check_and_incr_redis(self, current_key, previous_key, weight):
+        current_key = self.cache.make_and_validate_key(current_key)
+        previous_key = self.cache.make_and_validate_key(previous_key)
+        client = self.cache._cache.get_client(current_key, write=True)
+        script = client.register_script(SLIDING_WINDOW_LUA)
+        return script(keys=[current_key, previous_key], args=[weight, self.num_requests, self._expiry])
+
+    def _check_and_incr_local(self, current_key, previous_key, weight):
+        with _local_lock:
+            current = self.cache.get(current_key, 0)
+            previous = self.cache.get(previous_key, 0)
+            if previous * weight + current + 1 > self.num_requests:
+                return False, current, previous
+            self.cache.set(current_key, current + 1, timeout=self._expiry)
+            return True, current + 1, previous
+
+    def _incr_then_check(self, current_key, previous_key, weight):
+        try:
+            current = self.cache.incr(current_key)
+        except ValueError:
+            # First hit in this window (or evicted): create it. add() loses
+            # gracefully to a concurrent creator, then INCR like everyone else.
+            if self.cache.add(current_key, 1, timeout=self._expiry):
+                current = 1
+            else:
+                current = self.cache.incr(current_key)
+
+        previous = self.cache.get(previous_key, 0)
+        if previous * weight + current <= self.num_requests:
+            return True, current, previous
+        try:
+            self.cache.decr(current_key)
+        except ValueError:
+            pass
+        return False, current - 1, previous
+
+    def wait(self):
+        """Seconds until the estimated usage drops below the limit again."""
+        remaining = self.duration * (1 - self.elapsed)
+        if self.current >= self.num_requests:
+            # Even with the previous window fully aged out we are over: wait
+            # for this window to close and shrink as the next one's "previous".
+            overshoot = (self.current + 1 - self.num_requests) / max(self.current, 1)
+            return remaining + self.duration * overshoot
+        if not self.previous:
+            # Turned away while concurrent rejections were still counted
+            # (INCR/DECR fallback only).
+            return self.min_wait
+        needed = 1 - (self.num_requests - self.current - 1) / self.previous
+        return max(self.min_wait, (needed - self.elapsed) * self.duration)
+
+    def _ident(self, request):
         user = request.user
-        username = user.username
+        if user and user.is_authenticated:
+            return f"user-{user.pk}"
+        return f"ip-{self.get_ident(request)}"
+
+
+class AnonSlidingWindowThrottle(SlidingWindowThrottle):
+    """Limits anonymous callers per client IP (`anon` rate)."""
+    scope = "anon"
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            return None
+        return self.cache_format % {"scope": self.scope, "ident": self._ident(request)}
 
-        if not django_cache.get(username):
-            django_cache.set(username, 0, timeout=60)
 
-        django_cache.incr(username)
+class UserSlidingWindowThrottle(SlidingWindowThrottle):
+    """Limits authenticated users per user id (`user` rate)."""
+    scope = "user"
+
+    def get_cache_key(self, request, view):
+        if not (request.user and request.user.is_authenticated):
+            return None
+        return self.cache_format % {"scope": self.scope, "ident": self._ident(request)}
+
+
+class ScopedSlidingWindowThrottle(SlidingWindowThrottle):
+    """
+    Per-endpoint limits: the scope is `view.throttle_scopes[view.action]`,
+    falling back to `view.throttle_scope`; views without one are not limited.
+    Keyed per user id, or per client IP for anonymous callers.
+    """
+
+    def __init__(self):
+        # The scope is only known once the view is; resolve the rate then.
+        pass
+
+    def allow_request(self, request, view):
+        scopes = getattr(view, "throttle_scopes", None) or {}
+        self.scope = scopes.get(getattr(view, "action", None)) or getattr(view, "throttle_scope", None)
+        if not self.scope:
+            return True
+        self.rate = self.get_rate()
+        self.num_requests, self.duration = self.parse_rate(self.rate)
+        return super().allow_request(request, view)
 
-        return django_cache.get(username) <= 10
\ No newline at end of file
+    def get_cache_key(self, request, view):
+        return self.cache_format % {"scope": self.scope, "ident": self._ident(request)}
@@ -6,6 +6,7 @@ from .views import (
     PostViewSet, CommentViewSet, TagViewSet,
     UserViewSet, UserProfileViewSet, PostUserLikesViewSet,
     AuthViewSet,  # <-- expose auth endpoints if you use them
+    ExportView, MetricsView,
 )
 
 from rest_framework.decorators import api_view, permission_classes
@@ -42,4 +43,6 @@ urlpatterns = [
     path("token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
     path("me/", me, name="me"),
+    path("export/", ExportView.as_view(), name="export"),
+    path("metrics/", MetricsView.as_view(), name="metrics"),
 ]
@@ -1,32 +1,72 @@
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import OrderingFilter, SearchFilter
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.filters import OrderingFilter
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.views import APIView
 from rest_framework.viewsets import ModelViewSet, ViewSet
 from rest_framework.decorators import action
-from django.db.models import Count
+from rest_framework.exceptions import MethodNotAllowed, ValidationError
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+from django.db.models import F, Prefetch, Window, prefetch_related_objects
+from django.db.models.functions import RowNumber
 from django.contrib.auth.models import User
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import timezone
 from api.models import Tag, Post, PostUserLikes, UserProfile, Comment
 from api.permissions import (
     IsAdmin, PostUserLikesPermission,
     PostsPermission, TagsPermission, UserProfilePermission,
-    CommentsPermission,
+    CommentsPermission, current_profile,
 )
 from api.serializers import (
-    TagSerializer, CommentSerializer, PostUserLikesSerializer,
-    PostSerializer, UserProfileSerializer, UserSerializer
+    TagSerializer, CommentSerializer, CommentTreeSerializer, PostUserLikesSerializer,
+    PostSerializer, UserProfileSerializer, UserSerializer,
+    ReactionSerializer, LIKERS_LIMIT,
 )
-from api.throttles import MyRateThrottle
+from api.cache import AnonymousResponseCacheMixin
+from api.comment_tree import (
+    COMMENTS_PREVIEW_LIMIT, COMMENTS_PREVIEW_MAX,
+    load_comment_tree, prefetch_comment_previews,
+)
+from api.conditional import ConditionalGetMixin
+from api.export import EXPORT_FORMATS, EXPORTS, export_lines, parse_bound
+from api.fieldsets import SparseFieldsMixin
+from api.metrics import registry as metrics_registry
+from api.fast_serializers import (
+    COMMENT_VALUES, POST_VALUES, TAG_VALUES, FastListMixin,
+    comment_rows, post_rows, tag_rows, tags_by_post,
+)
+from api.pagination import PageOrCursorPagination
+from api.post_import import DEFAULT_CHUNK_SIZE as IMPORT_CHUNK_SIZE, import_posts
+from api.reactions import set_reaction
+from api.reaction_buffer import buffer_reaction, merge_pending, write_behind_enabled
+from api.search import PostSearchFilter
+from api.tag_index import suggest_tags
 from rest_framework.authtoken.serializers import AuthTokenSerializer
 from api.auth import get_jwt
 
+def _int_param(request, name, default, lo, hi):
+    """Integer query parameter within [lo, hi] (hi=None: unbounded), else 400."""
+    raw = request.query_params.get(name)
+    if raw in (None, ""):
+        return default
+    try:
+        value = int(raw)
+    except (TypeError, ValueError):
+        raise ValidationError({name: ["Must be an integer."]})
+    if value < lo or (hi is not None and value > hi):
+        bounds = f"between {lo} and {hi}" if hi is not None else f"at least {lo}"
+        raise ValidationError({name: [f"Must be {bounds}."]})
+    return value
+
+
 # ---------- Auth ----------
 class AuthViewSet(ViewSet):
     queryset = User.objects.all()
     serializer_class = AuthTokenSerializer
     permission_classes = [AllowAny]
+    throttle_scopes = {"login": "auth", "register": "auth"}
 
     def list(self, request):
         return Response({
@@ -54,25 +94,36 @@ class AuthViewSet(ViewSet):
         )
 
 # ---------- Tags ----------
-class TagViewSet(ModelViewSet):
+class TagViewSet(AnonymousResponseCacheMixin, FastListMixin, ModelViewSet):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
+    fast_list_fields = TAG_VALUES
     permission_classes = [TagsPermission]
-    throttle_classes = [MyRateThrottle]
+    throttle_scope = "tags"
+    response_cache_resources = {
+        "list": ("tags",),
+        "retrieve": ("tags",),
+    }
+
+    def fast_list_rows(self, rows):
+        return tag_rows(rows)
 
 
 # ---------- Posts ----------
-class PostViewSet(ModelViewSet):
+class PostViewSet(
+    ConditionalGetMixin, AnonymousResponseCacheMixin, SparseFieldsMixin, FastListMixin, ModelViewSet
+):
     queryset = (
         Post.objects
         .select_related("author__user")
         .prefetch_related("tags")
-        .annotate(likes_count=Count("user_likes", distinct=True))  # correct reverse name
+        .defer("search_vector")
     )
     serializer_class = PostSerializer
     permission_classes = [PostsPermission]
 
-    filter_backends = [DjangoFilterBackend, OrderingFilter, SearchFilter]
+    # PostSearchFilter runs last so relevance ordering wins over the default ordering.
+    filter_backends = [DjangoFilterBackend, OrderingFilter, PostSearchFilter]
 
     filterset_fields = {
         "author": ["exact"],
@@ -80,19 +131,26 @@ class PostViewSet(ModelViewSet):
         "tags": ["exact"],
     }
 
-    search_fields = [
-        "title",
-        "text",
-        "author__user__username",
-        "tags__name",
-    ]
-
-    ordering_fields = ["title", "created_at", "updated_at", "likes_count"]
+    ordering_fields = ["title", "created_at", "updated_at", "likes_count", "dislikes_count", "comments_count"]
     ordering = ["-created_at"]
-    pagination_class = PageNumberPagination
+    pagination_class = PageOrCursorPagination
+    cursor_ordering_fields = ["created_at", "likes_count", "dislikes_count", "comments_count"]
+    response_cache_resources = {
+        "list": ("posts", "tags", "comments", "likes"),
+        "retrieve": ("posts", "tags", "comments", "likes"),
+        "tag_suggest": ("tags",),
+    }
+    conditional_resources = ("posts", "tags", "comments", "likes")
+    throttle_scopes = {"tag_suggest": "tag_suggest", "reaction": "reactions"}
+    fast_list_fields = POST_VALUES
+    sparse_fields_actions = ("list", "retrieve", "mine")
+    expandable_fields = ("comments_preview",)
+    # Feeds show `excerpt`; the full body comes with detail or ?fields=...,text.
+    omitted_by_default = {"list": ("text",)}
 
     def get_queryset(self):
         qs = super().get_queryset()
+        qs = self._prune_for_fields(qs)
 
         # Optional friendly tag filter by name: ?tag=<name>
         tag_name = self.request.query_params.get("tag")
@@ -104,8 +162,135 @@ class PostViewSet(ModelViewSet):
         if tag_id and str(tag_id).isdigit():
             qs = qs.filter(tags__id=int(tag_id))
 
-        # DISTINCT avoids duplicates due to M2M joins
-        return qs.distinct()
+        # No DISTINCT needed: each filter above matches at most one tag per post
+        # (names are unique case-insensitively), and PostSearchFilter matches
+        # the post's own search_vector rather than joining tags.
+        return qs
+
+    def _prune_for_fields(self, qs):
+        # ?fields=: skip the joins, prefetches and columns nobody asked for.
+        if self.requested_fields() is None:
+            return qs
+        if not self.wants("author_username"):
+            qs = qs.select_related(None)
+        if not self.wants("tags"):
+            qs = qs.prefetch_related(None)
+        if not self.wants("text"):
+            qs = qs.defer("text")
+        return qs
+
+    def requested_expansions(self):
+        # ?include=comments_preview predates ?expand=.
+        return super().requested_expansions() | ({"comments_preview"} & self._includes())
+
+    def get_serializer(self, *args, **kwargs):
+        # Read paths (list/retrieve/mine) hand over instances without data:
+        # resolve per-viewer state for the whole page up front.
+        if args and "data" not in kwargs:
+            posts = args[0] if kwargs.get("many") else [args[0]]
+            context = self.get_serializer_context()
+            context.update(self.get_page_context(posts))
+            kwargs["context"] = context
+        return super().get_serializer(*args, **kwargs)
+
+    def get_page_context(self, posts):
+        """
+        Per-page serializer context, computed with one query per concern
+        instead of one per post.
+        """
+        if self.wants("likers"):
+            self._prefetch_likers(posts)
+        if self.wants("comments_preview"):
+            limit = _int_param(self.request, "comments_preview", COMMENTS_PREVIEW_LIMIT, 1, COMMENTS_PREVIEW_MAX)
+            prefetch_comment_previews(posts, limit)
+        if not (self.wants("liked_by_me") or self.wants("my_reaction")):
+            return {"my_reactions": {}}
+        return {"my_reactions": self._my_reactions([p.pk for p in posts])}
+
+    def _includes(self):
+        raw = self.request.query_params.get("include", "")
+        return {part.strip() for part in raw.split(",") if part.strip()}
+
+    def _prefetch_likers(self, posts):
+        """
+        Attach the newest likers to every post whose likers the viewer may see
+        (own posts, or all posts for managers) as `recent_likers`. The sliced
+        Prefetch is compiled to a single ROW_NUMBER() OVER (PARTITION BY post)
+        query.
+        """
+        me = current_profile(self.request.user)
+        if me is None:
+            return
+        if getattr(me, "role", "") != "manager":
+            posts = [p for p in posts if p.author_id == me.id]
+        if not posts:
+            return
+        prefetch_related_objects(
+            posts,
+            Prefetch(
+                "user_likes",
+                queryset=(
+                    PostUserLikes.objects
+                    .select_related("user__user")
+                    .order_by("-id")[:LIKERS_LIMIT]
+                ),
+                to_attr="recent_likers",
+            ),
+        )
+
+    def _my_reactions(self, ids):
+        """{post_id: like_type} for the current viewer over the given post ids."""
+        profile = current_profile(self.request.user)
+        if profile is None or not ids:
+            return {}
+        reactions = dict(
+            PostUserLikes.objects
+            .filter(user=profile, post_id__in=ids)
+            .values_list("post_id", "like_type")
+        )
+        # Write-behind mode: the viewer sees their own not-yet-flushed clicks.
+        return merge_pending(profile.pk, reactions, ids)
+
+    # ---------- fast list path (see api.fast_serializers) ----------
+    def use_fast_list(self):
+        # Comment previews need model instances; use the serializer for those.
+        return super().use_fast_list() and not self.wants("comments_preview")
+
+    def get_fast_list_fields(self):
+        skip = {
+            "text": not self.wants("text"),
+            "author__user__username": not self.wants("author_username"),
+        }
+        return tuple(f for f in self.fast_list_fields if not skip.get(f))
+
+    def fast_list_rows(self, rows):
+        ids = [r["id"] for r in rows]
+        tags = tags_by_post(ids) if self.wants("tags") else {}
+        wants_reaction = self.wants("liked_by_me") or self.wants("my_reaction")
+        reactions = self._my_reactions(ids) if wants_reaction else {}
+        likers = self._likers_by_post(rows) if self.wants("likers") else {}
+        return self.pick_fields(post_rows(rows, tags, reactions, likers))
+
+    def _likers_by_post(self, rows):
+        """Same visibility and limit as _prefetch_likers, as plain dicts."""
+        me = current_profile(self.request.user)
+        if me is None:
+            return {}
+        manager = getattr(me, "role", "") == "manager"
+        ids = [r["id"] for r in rows if manager or r["author_id"] == me.id]
+        if not ids:
+            return {}
+        likers = {pk: [] for pk in ids}
+        rows = (
+            PostUserLikes.objects.filter(post_id__in=ids)
+            .annotate(rn=Window(RowNumber(), partition_by=F("post_id"), order_by=F("id").desc()))
+            .filter(rn__lte=LIKERS_LIMIT)
+            .order_by("post_id", "-id")
+            .values_list("post_id", "user_id", "user__user__username")
+        )
+        for post_id, user_id, username in rows:
+            likers[post_id].append({"id": user_id, "username": username})
+        return likers
 
     @action(detail=False, methods=["get"], permission_classes=[IsAdmin])
     def mine(self, request):
@@ -113,39 +298,182 @@ class PostViewSet(ModelViewSet):
         List posts authored by the current user (admin-only endpoint).
         Robust to either reverse name: user.profile or user.userprofile.
         """
-        u = request.user
-        profile = getattr(u, "profile", None) or getattr(u, "userprofile", None)
+        profile = current_profile(request.user)
         if profile is None:
             return Response([], status=status.HTTP_200_OK)
 
         qs = self.get_queryset().filter(author=profile).order_by("-created_at")
-        ser = self.get_serializer(qs, many=True, context={"request": request})
+        ser = self.get_serializer(list(qs), many=True)
         return Response(ser.data)
 
+    @action(detail=False, methods=["post"], url_path="import", permission_classes=[IsAdmin])
+    def bulk_import(self, request):
+        """
+        POST /api/posts/import/?chunk_size=500&dry_run=1  (body: NDJSON, one post per line)
+        Each line: {"title", "text", "author": <username, default: you>, "tags": [...]}.
+        Imports in chunks with bulk inserts; each chunk is one transaction.
+        Returns {"created", "failed", "errors": [{"line", "errors"}], "dry_run"}.
+        """
+        chunk_size = _int_param(request, "chunk_size", IMPORT_CHUNK_SIZE, 1, 5000)
+        dry_run = request.query_params.get("dry_run", "").lower() in ("1", "true", "yes")
+        # Read the body line by line instead of through a parser, so large
+        # uploads are never held in memory as one document.
+        stream = request.stream
+        lines = iter(stream.readline, b"") if stream is not None else []
+
+        report = import_posts(lines, default_author=current_profile(request.user),
+                              chunk_size=chunk_size, dry_run=dry_run)
+        if report["created"]:
+            code = status.HTTP_201_CREATED
+        elif report["failed"]:
+            code = status.HTTP_400_BAD_REQUEST
+        else:
+            code = status.HTTP_200_OK
+        return Response(report, status=code)
+
     @action(detail=False, methods=["get"], permission_classes=[AllowAny])
     def tag_suggest(self, request):
         """
         GET /api/posts/tag_suggest/?q=py
-        Returns top 10 tags (by usage) matching q.
+        Returns top 10 tags (by usage) starting with q, topped up with tags
+        containing q.
         Public (no auth required).
         """
+        return self.cached_response(request, self._tag_suggest)
+
+    def _tag_suggest(self, request):
         q = request.query_params.get("q", "").strip()
-        tags_qs = Tag.objects.annotate(n=Count("posts", distinct=True))
-        if q:
-            tags_qs = tags_qs.filter(name__icontains=q)
-        tags_qs = tags_qs.order_by("-n", "name")[:10]
-        return Response([{"id": t.id, "name": t.name, "count": t.n} for t in tags_qs])
+        return Response(suggest_tags(q))
+
+    @action(detail=True, methods=["put"], permission_classes=[IsAuthenticated])
+    def reaction(self, request, pk=None):
+        """
+        PUT /api/posts/<id>/reaction/ {"reaction": "like" | "dislike" | null, "toggle": false}
+        Sets (or with toggle=true, flips off) the current user's reaction in a
+        single statement and returns the new state with the post's counters.
+        """
+        profile = current_profile(request.user)
+        if profile is None:
+            return Response({"detail": "Profile not found."}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            post_id = int(pk)
+        except (TypeError, ValueError):
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        ser = ReactionSerializer(data=request.data)
+        ser.is_valid(raise_exception=True)
+        result = set_reaction(profile, post_id, ser.validated_data["reaction"],
+                              toggle=ser.validated_data["toggle"])
+        if result is None:
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+        return Response(result)
+
+    @action(detail=True, methods=["get"], url_path="comments/tree", permission_classes=[AllowAny])
+    def comments_tree(self, request, pk=None):
+        """
+        GET /api/posts/<id>/comments/tree/?depth=3&limit=10
+        The nested thread, loaded with one recursive query: up to `limit`
+        comments per level, `depth` levels deep. Cut-off branches carry a
+        `more` link (?parent=<comment id>&after=<last shown id>); `next`
+        continues the requested level.
+        """
+        try:
+            post_id = int(pk)
+        except (TypeError, ValueError):
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+        depth = _int_param(request, "depth", 3, 1, 10)
+        limit = _int_param(request, "limit", 10, 1, 100)
+        after = _int_param(request, "after", 0, 0, None)
+        parent = request.query_params.get("parent")
+        parent = _int_param(request, "parent", None, 1, None) if parent else None
+
+        roots, has_more = load_comment_tree(post_id, parent=parent, after=after, depth=depth, limit=limit)
+        if not roots and not Post.objects.filter(pk=post_id).exists():
+            return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+
+        url = request.build_absolute_uri()
+
+        def more_url(parent_id, after_id):
+            link = replace_query_param(url, "parent", parent_id)
+            if after_id:
+                return replace_query_param(link, "after", after_id)
+            return remove_query_param(link, "after")
+
+        data = CommentTreeSerializer(roots, many=True, context={
+            **self.get_serializer_context(), "more_url": more_url,
+        }).data
+        return Response({
+            "post": post_id,
+            "parent": parent,
+            "results": data,
+            "next": replace_query_param(url, "after", roots[-1].pk) if has_more else None,
+        })
 
 
 # ---------- Comments ----------
-class CommentViewSet(ModelViewSet):
-    queryset = Comment.objects.all()
+class CommentViewSet(ConditionalGetMixin, SparseFieldsMixin, FastListMixin, ModelViewSet):
+    queryset = Comment.objects.select_related("author__user")
     serializer_class = CommentSerializer
     permission_classes = [CommentsPermission]
     filter_backends = [DjangoFilterBackend, OrderingFilter]
     filterset_fields = ["post"]
     ordering_fields = ["id", "created_at"]
     ordering = ["-id"]
+    pagination_class = PageOrCursorPagination
+    cursor_ordering_fields = ["created_at"]
+    conditional_resources = ("comments",)
+    fast_list_fields = COMMENT_VALUES
+
+    def get_queryset(self):
+        qs = super().get_queryset()
+        if self.requested_fields() is not None:
+            if not self.wants("author_username"):
+                qs = qs.select_related(None)
+            if not self.wants("text"):
+                qs = qs.defer("text")
+        return qs
+
+    def get_fast_list_fields(self):
+        skip = {
+            "text": not self.wants("text"),
+            "author__user__username": not self.wants("author_username"),
+        }
+        return tuple(f for f in self.fast_list_fields if not skip.get(f))
+
+    def fast_list_rows(self, rows):
+        return self.pick_fields(comment_rows(rows))
+
+    @action(detail=False, methods=["get"])
+    def preview(self, request):
+        """
+        GET /api/comments/preview/?posts=1,2,3&limit=3
+        The newest `limit` comments of each listed post (one window query),
+        with each post's comment count. Unknown post ids are left out.
+        """
+        raw = request.query_params.get("posts", "")
+        try:
+            ids = list(dict.fromkeys(int(part) for part in raw.split(",") if part.strip()))
+        except ValueError:
+            raise ValidationError({"posts": ["Comma-separated post ids expected."]})
+        if not ids:
+            raise ValidationError({"posts": ["This field is required."]})
+        if len(ids) > 100:
+            raise ValidationError({"posts": ["At most 100 posts per request."]})
+        limit = _int_param(request, "limit", COMMENTS_PREVIEW_LIMIT, 1, COMMENTS_PREVIEW_MAX)
+
+        posts = list(Post.objects.filter(pk__in=ids).only("id", "comments_count").order_by())
+        prefetch_comment_previews(posts, limit)
+        order = {pk: i for i, pk in enumerate(ids)}
+        posts.sort(key=lambda p: order[p.pk])
+        context = self.get_serializer_context()
+        return Response([
+            {
+                "post": p.pk,
+                "comments_count": p.comments_count,
+                "comments": CommentSerializer(p.preview_comments, many=True, context=context).data,
+            }
+            for p in posts
+        ])
 
 
 # ---------- PostUserLikes ----------
@@ -153,10 +481,13 @@ class PostUserLikesViewSet(ModelViewSet):
     queryset = PostUserLikes.objects.select_related("user", "post").all().order_by("-id")
     serializer_class = PostUserLikesSerializer
     permission_classes = [IsAuthenticated, PostUserLikesPermission]
+    throttle_scopes = {"create": "reactions", "delete_by_post": "reactions"}
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ["post"]
     ordering_fields = ["id", "created_at"]
     ordering = ["-id"]
+    pagination_class = PageOrCursorPagination
+    cursor_ordering_fields = ["created_at"]
 
     def get_queryset(self):
         base = super().get_queryset()
@@ -164,6 +495,16 @@ class PostUserLikesViewSet(ModelViewSet):
             return base.filter(user__user=self.request.user)
         return base
 
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        # Direct row writes would race the write-behind buffer, whose next
+        # flush overwrites them; create and delete_by_post go through it.
+        if write_behind_enabled() and self.action in ("update", "partial_update", "destroy"):
+            raise MethodNotAllowed(
+                request.method,
+                detail="Reactions are buffered; use PUT /api/posts/<id>/reaction/.",
+            )
+
     def create(self, request, *args, **kwargs):
         post_id = request.data.get("post")
         if not post_id:
@@ -176,6 +517,22 @@ class PostUserLikesViewSet(ModelViewSet):
                             status=status.HTTP_400_BAD_REQUEST)
 
         profile = request.user.profile
+        if write_behind_enabled():
+            # Buffered like an explicit reaction; an existing one is kept.
+            result = buffer_reaction(profile, post_id, "like", keep_existing=True)
+            if result is None:
+                return Response({"detail": "Not found."}, status=status.HTTP_404_NOT_FOUND)
+            like = None
+            if not result["changed"]:
+                like = PostUserLikes.objects.filter(
+                    post_id=post_id, user=profile, like_type=result["reaction"]
+                ).first()
+            if like is None:
+                # Not written until the next flush: same shape, no id or timestamps yet.
+                like = PostUserLikes(post_id=post_id, user=profile, like_type=result["reaction"])
+            return Response(self.get_serializer(like).data,
+                            status=status.HTTP_201_CREATED if result["changed"] else status.HTTP_200_OK)
+
         like, created = PostUserLikes.objects.get_or_create(post_id=post_id, user=profile)
 
         self.check_object_permissions(request, like)
@@ -190,6 +547,12 @@ class PostUserLikesViewSet(ModelViewSet):
         DELETE /api/post-user-likes/<post_id>/by-post/ → unlike this post for the current user.
         """
         profile = request.user.profile
+        if write_behind_enabled():
+            result = buffer_reaction(profile, int(post_id), None)
+            if result is None or not result["changed"]:
+                return Response({"detail": "Like not found."}, status=status.HTTP_404_NOT_FOUND)
+            return Response(status=status.HTTP_204_NO_CONTENT)
+
         try:
             like = PostUserLikes.objects.get(post_id=post_id, user=profile)
         except PostUserLikes.DoesNotExist:
@@ -212,3 +575,63 @@ class UserViewSet(ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
     permission_classes = [IsAdmin]
+
+
+# ---------- Export ----------
+EXPORT_CONTENT_TYPES = {
+    "ndjson": "application/x-ndjson; charset=utf-8",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+class ExportView(APIView):
+    """
+    GET /api/export/?kind=posts|comments|likes&output=ndjson|csv
+                    &updated_after=<date or datetime>&updated_before=<date or datetime>
+    Streams every matching row (id order) in constant memory; posts carry
+    their tag names. `output` rather than `format`, which DRF reserves for
+    renderer selection. Managers only.
+    """
+    permission_classes = [IsAdmin]
+    throttle_scope = "export"
+
+    def get(self, request):
+        params = request.query_params
+        kind = params.get("kind", "posts")
+        if kind not in EXPORTS:
+            raise ValidationError({"kind": [f"Must be one of: {', '.join(EXPORTS)}."]})
+        output = params.get("output", "ndjson")
+        if output not in EXPORT_FORMATS:
+            raise ValidationError({"output": [f"Must be one of: {', '.join(EXPORT_FORMATS)}."]})
+
+        bounds = {}
+        for name in ("updated_after", "updated_before"):
+            if params.get(name):
+                try:
+                    bounds[name] = parse_bound(params[name])
+                except ValueError:
+                    raise ValidationError({name: ["Must be an ISO 8601 date or datetime."]})
+
+        response = StreamingHttpResponse(
+            export_lines(kind, output, **bounds),
+            content_type=EXPORT_CONTENT_TYPES[output],
+        )
+        stamp = timezone.now().strftime("%Y%m%d-%H%M%S")
+        response["Content-Disposition"] = f'attachment; filename="{kind}-{stamp}.{output}"'
+        response["Cache-Control"] = "no-store"
+        return response
+
+
+# ---------- Metrics ----------
+class MetricsView(APIView):
+    """
+    GET /api/metrics/ — per-view latency histograms and query totals of this
+    worker process, in Prometheus text format. Managers only.
+    """
+    permission_classes = [IsAdmin]
+
+    def get(self, request):
+        return HttpResponse(
+            metrics_registry.render_prometheus(),
+            content_type="text/plain; version=0.0.4; charset=utf-8",
+        )
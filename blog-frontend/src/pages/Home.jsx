@@ -293,8 +293,8 @@ export default function Home() {
                         : "—"}
                     </Typography>
                     <Typography variant="body2" sx={{ mt: 1.5 }}>
-                      {(p.text ?? "").slice(0, 160)}
-                      {(p.text ?? "").length > 160 ? "…" : ""}
+                      {p.excerpt ||
+                        `${(p.text ?? "").slice(0, 160)}${(p.text ?? "").length > 160 ? "…" : ""}`}
                     </Typography>
                     <Stack
                       direction="row"
@@ -15,6 +15,8 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    # OpClass / GIN indexes and full-text search fields in api.models.
+    "django.contrib.postgres",
     # 3rd party
     "rest_framework",
     "rest_framework_simplejwt",
@@ -27,6 +29,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
+    "api.metrics.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -34,6 +37,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "api.profiling.RequestProfilerMiddleware",
 ]
 
 ROOT_URLCONF = "finalproject.urls"
@@ -86,6 +90,39 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 CORS_ALLOW_ALL_ORIGINS = True
 
+# Shared cache for response caching, throttling and invalidation counters.
+# Set REDIS_URL (requires `pip install redis`) whenever more than one worker
+# process runs; the local-memory fallback is per process.
+REDIS_URL = config("REDIS_URL", default="")
+if REDIS_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+
+# Seconds an anonymous GET response may live in the cache (writes invalidate earlier).
+RESPONSE_CACHE_TIMEOUT = config("RESPONSE_CACHE_TIMEOUT", cast=int, default=300)
+
+# Write-behind reactions: PUT /api/posts/<id>/reaction/ only appends to a buffer
+# in the cache, applied in batches by `manage.py flush_reactions` (or by a
+# thread in each web process with REACTION_FLUSH_THREAD). Needs REDIS_URL: startup
+# fails with ImproperlyConfigured on a per-process cache.
+REACTION_WRITE_BEHIND = config("REACTION_WRITE_BEHIND", cast=bool, default=False)
+REACTION_FLUSH_THREAD = config("REACTION_FLUSH_THREAD", cast=bool, default=False)
+REACTION_FLUSH_INTERVAL_MS = config("REACTION_FLUSH_INTERVAL_MS", cast=int, default=250)
+
+# List endpoints (posts, comments, tags) build their JSON from .values() rows
+# instead of serializer instances; see api/fast_serializers.py.
+FAST_LIST_SERIALIZATION = config("FAST_LIST_SERIALIZATION", cast=bool, default=True)
+
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
         "rest_framework_simplejwt.authentication.JWTAuthentication",
@@ -96,9 +133,21 @@ REST_FRAMEWORK = {
         "rest_framework.filters.OrderingFilter",
     ),
     "DEFAULT_SCHEMA_CLASS": "drf_spectacular.openapi.AutoSchema",
+    "DEFAULT_THROTTLE_CLASSES": (
+        "api.throttles.AnonSlidingWindowThrottle",
+        "api.throttles.UserSlidingWindowThrottle",
+        "api.throttles.ScopedSlidingWindowThrottle",
+    ),
     "DEFAULT_THROTTLE_RATES": {
-        "anon": "100/day",
-        "user": "1000/day",
+        # Global limits per client IP (anon) / user id (user).
+        "anon": config("THROTTLE_ANON", default="120/min"),
+        "user": config("THROTTLE_USER", default="600/min"),
+        # Per-endpoint scopes (see `throttle_scope(s)` on the viewsets).
+        "auth": "10/min",
+        "tags": "10/min",
+        "tag_suggest": "120/min",
+        "reactions": "60/min",
+        "export": "10/min",
     },
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 10,
@@ -114,3 +163,17 @@ SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
 }
+
+# Per-request metrics (api/metrics.py): Server-Timing header, slow-request log
+# (threshold 0 = off) and per-view latency histograms at /api/metrics/.
+REQUEST_METRICS = config("REQUEST_METRICS", cast=bool, default=True)
+SLOW_REQUEST_MS = config("SLOW_REQUEST_MS", cast=int, default=500)
+SLOW_REQUEST_QUERIES = config("SLOW_REQUEST_QUERIES", cast=int, default=50)
+
+# On-demand profiling for managers/staff: ?__profile=1 (or X-Profile: 1) returns a
+# cProfile + SQL + EXPLAIN ANALYZE report; ?__profile=save writes it to PROFILE_DIR.
+REQUEST_PROFILING = config("REQUEST_PROFILING", cast=bool, default=True)
+PROFILE_DIR = config("PROFILE_DIR", default=str(BASE_DIR / "profiles"))
+PROFILE_MAX_PER_MINUTE = config("PROFILE_MAX_PER_MINUTE", cast=int, default=6)
+PROFILE_MAX_EXPLAINS = config("PROFILE_MAX_EXPLAINS", cast=int, default=5)
+PROFILE_EXPLAIN_TIMEOUT_MS = config("PROFILE_EXPLAIN_TIMEOUT_MS", cast=int, default=5000)